@@ -0,0 +1,246 @@
+""" Crawl -> parse -> join -> render benchmark on synthetic TDX payloads
+
+    python -m benchmarks.pipeline --vds 500 2000 --history 60 240 --repeat 5
+
+Every stage is timed `repeat` times (after one warm-up run) for each detector count;
+throughput is records per second at the median latency and peak memory is the highest
+RSS seen while the stage ran, above the RSS before it. Parsers & joins are run for the
+polars, pandas and dict `df_type` paths. Results are written to benchmarks/results/ (ignored
+by git) and compared with the previous run (or --baseline) to flag regressions.
+"""
+import os
+import gc
+import sys
+import glob
+import json
+import time
+import platform
+import argparse
+import threading
+import subprocess
+import numpy as np
+import pandas as pd
+import polars as pl
+from datetime import datetime, timedelta
+from transport.tdx import data
+from transport.tdx.mock import MockTDXServer, SyntheticTDX, TAIPEI
+from transport.tdx.crawler import RealTimeRoadInfoCrawler, LinkInfoCrawler
+import demo
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DF_TYPES = ('polars', 'pandas', 'dict')
+NOW = datetime(2024, 4, 19, 8, 15, tzinfo=TAIPEI)
+
+
+def _rss() -> int:
+    if (psutil):
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+class _PeakRSS:
+    """ Sample RSS in a background thread while the block runs """
+    def __init__(self, interval: float = 0.002) -> None:
+        self.interval = interval
+        self.peak = 0
+
+    def __enter__(self) -> '_PeakRSS':
+        self.base = _rss()
+        self.peak = self.base
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self) -> None:
+        while (not self._stop.wait(self.interval)):
+            self.peak = max(self.peak, _rss())
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss())
+
+
+def measure(stage: str, fn: callable, records: int, repeat: int, **labels) -> dict:
+    fn()
+    latencies, peak = [], 0
+    for _ in range(repeat):
+        gc.collect()
+        with _PeakRSS() as rss:
+            start = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - start)
+        peak = max(peak, rss.peak - rss.base)
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    result = {
+        'stage': stage, **labels, 'records': records,
+        'p50_ms': p50 * 1e3, 'p90_ms': p90 * 1e3, 'p99_ms': p99 * 1e3,
+        'throughput_rps': records / p50 if (p50 > 0) else None,
+        'peak_mib': peak / 2**20,
+    }
+    print(f"{stage:<16} {labels.get('df_type', ''):<7} vds={labels['vds']:<6} minutes={labels.get('minutes', ''):<5} "
+          f"p50={result['p50_ms']:9.2f}ms p99={result['p99_ms']:9.2f}ms "
+          f"{result['throughput_rps'] or 0:12,.0f} rec/s peak={result['peak_mib']:8.1f}MiB")
+    return result
+
+
+def _join(static: any, links: any, dynamic: any, df_type: str) -> any:
+    """ The static ⟕ RoadClass ⟕ dynamic join of draw_vdMap for each df_type """
+    if (df_type == 'polars'):
+        links = links[['LinkID', 'RoadClass']].with_columns(pl.col('LinkID').cast(pl.Categorical)).unique()
+        return static.join(links, how='left', left_on='DetectionLinkID', right_on='LinkID') \
+                     .join(dynamic, how='left', on='VDID')
+    if (df_type == 'pandas'):
+        links = links[['LinkID', 'RoadClass']].drop_duplicates()
+        joined = static.astype({'DetectionLinkID': str}).merge(links, how='left', left_on='DetectionLinkID',
+                                                                right_on='LinkID').drop(columns='LinkID')
+        return joined.merge(dynamic, how='left', on='VDID', suffixes=('', '_dynamic'))
+    roadClass = {link['LinkID']: link['RoadClass'] for link in links}
+    dynamicByVD = {row['VDID']: row for row in dynamic}
+    return [
+        {**row, 'RoadClass': roadClass.get(row['DetectionLinkID']), **dynamicByVD.get(row['VDID'], {})}
+        for row in static
+    ]
+
+
+def run_vds(vds: int, repeat: int, seed: int) -> list:
+    results = []
+    synthetic = SyntheticTDX(seed=seed, vds=vds)
+    with MockTDXServer(synthetic, now=NOW) as server:
+        crawler, linkCrawler = RealTimeRoadInfoCrawler(), LinkInfoCrawler()
+        server.configure(crawler, linkCrawler)
+        kwargs = {'client_id': 'bench', 'client_secret': 'bench', 'city': 'Taipei', 'fileformat': 'JSON'}
+        staticText = crawler.response(target='/VD', **kwargs).text
+        liveText = crawler.response(target='/Live/VD', **kwargs).text
+        linkIDs = [link['LinkID'] for vd in synthetic.vds for link in vd['Links']]
+        linkRecords = json.loads(linkCrawler.response(client_id='bench', client_secret='bench', link_id=linkIDs,
+                                                      target='/LinkID', fileformat='JSON').text)
+
+        results.append(measure('crawl_static', lambda: crawler.response(target='/VD', **kwargs).content,
+                               vds, repeat, vds=vds))
+        results.append(measure('crawl_live', lambda: crawler.response(target='/Live/VD', **kwargs).content,
+                               vds, repeat, vds=vds))
+        results.append(measure('crawl_links', lambda: linkCrawler.response(
+            client_id='bench', client_secret='bench', link_id=linkIDs, target='/LinkID', fileformat='JSON').content,
+            len(linkIDs), repeat, vds=vds))
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    for df_type in DF_TYPES:
+        labels = {'vds': vds, 'df_type': df_type}
+        results.append(measure('parse_static', lambda: data.getVDStatic([staticText], today, df_type),
+                               vds, repeat, **labels))
+        results.append(measure('parse_dynamic', lambda: data.getVDDynamic([liveText], df_type=df_type),
+                               vds, repeat, **labels))
+        results.append(measure('parse_links', lambda: data.getLinkInfo(linkRecords, df_type),
+                               len(linkRecords), repeat, **labels))
+        static = data.getVDStatic([staticText], today, df_type)
+        dynamic = data.getVDDynamic([liveText], df_type=df_type)
+        links = data.getLinkInfo(linkRecords, df_type)
+        results.append(measure('join', lambda: _join(static, links, dynamic, df_type), vds, repeat, **labels))
+
+    joined = _join(data.getVDStatic([staticText], today), data.getLinkInfo(linkRecords),
+                   data.getVDDynamic([liveText]), 'polars')
+    results.append(measure('classify', lambda: demo.trafficSituation(joined), vds, repeat,
+                           vds=vds, df_type='polars'))
+    classified = demo.trafficSituation(joined)
+    results.append(measure('render_geojson', lambda: demo.VDSnapshot(classified), vds, repeat,
+                           vds=vds, df_type='polars'))
+    return results
+
+
+def run_history(vds: int, minutes: int, repeat: int, seed: int) -> list:
+    synthetic = SyntheticTDX(seed=seed, vds=vds)
+    day = NOW.replace(hour=0, minute=0)
+    contents = [
+        json.dumps(synthetic.vd_live_record(i, day + timedelta(minutes=m), historical=True), ensure_ascii=False)
+        for m in range(minutes) for i in range(vds)
+    ]
+    date = day.strftime('%Y-%m-%d')
+    return [
+        measure('parse_history', lambda: data.getVDDynamic(contents, date, df_type), len(contents), repeat,
+                vds=vds, minutes=minutes, df_type=df_type)
+        for df_type in DF_TYPES
+    ]
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _key(result: dict) -> tuple:
+    return (result['stage'], result.get('df_type'), result['vds'], result.get('minutes'))
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> list:
+    """ Stages whose median latency grew by more than `threshold` against the baseline """
+    with open(baseline_path) as f:
+        baseline = {_key(r): r for r in json.load(f)['results']}
+    regressions = []
+    for result in results:
+        before = baseline.get(_key(result))
+        if (before) and (before['p50_ms'] > 0) and (result['p50_ms'] > before['p50_ms'] * (1 + threshold)):
+            regressions.append((result, before))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--vds', type=int, nargs='+', default=[500, 2000], help='detector counts')
+    parser.add_argument('--history', type=int, nargs='+', default=[60, 240], help='history lengths in minutes')
+    parser.add_argument('--history-vds', type=int, default=500, help='detector count of the history runs')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help='results file to compare with (default: the latest one)')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed p50 slowdown, 0.2 = 20%%')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    results = []
+    for vds in args.vds:
+        results += run_vds(vds, args.repeat, args.seed)
+    for minutes in args.history:
+        results += run_history(args.history_vds, minutes, args.repeat, args.seed)
+
+    previous = sorted(glob.glob(os.path.join(RESULTS_DIR, '*.json')))
+    baseline = args.baseline if (args.baseline) else (previous[-1] if (previous) else None)
+    if (baseline):
+        regressions = compare(results, baseline, args.threshold)
+        print(f"\nCompared with {baseline}: {len(regressions)} regression(s)")
+        for result, before in regressions:
+            print(f"  {' '.join(str(x) for x in _key(result) if (x is not None))}: "
+                  f"{before['p50_ms']:.2f}ms -> {result['p50_ms']:.2f}ms")
+
+    if (not args.no_save):
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        revision = _git_revision()
+        path = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{revision or 'unknown'}.json")
+        with open(path, 'w') as f:
+            json.dump({
+                'meta': {
+                    'created': datetime.now().isoformat(timespec='seconds'),
+                    'revision': revision,
+                    'python': sys.version.split()[0],
+                    'polars': pl.__version__,
+                    'pandas': pd.__version__,
+                    'platform': platform.platform(),
+                    'cpus': os.cpu_count(),
+                    'args': vars(args),
+                },
+                'results': results,
+            }, f, indent=1)
+        print(f"Saved {path}")
@@ -1,216 +1,344 @@
 import polars as pl
+import numpy as np
 import folium
 import json
+import gzip
+import math
+import time
+import hashlib
 import argparse
-from flask import Flask
-from datetime import datetime
+import threading
+from flask import Flask, Response, request
+from datetime import datetime, timezone
 from transport.tdx.crawler import RealTimeRoadInfoCrawler, LinkInfoCrawler
+from transport.tdx.cache import StaticCache
 from transport.tdx import data
+from transport.tdx.metrics import REGISTRY, timed
 
 
 app = Flask(__name__)
 
 
-def trafficSituation(vdInfo: pl.DataFrame) -> tuple:
-    totalVolume = vdInfo[['MotorVolume','SmallCarVolume','LargeCarVolume','TruckCarVolume']].sum_horizontal()[0]
-    if (totalVolume > 0):
-        if (vdInfo['Speed'][0] < 0) or (vdInfo['Occupancy'][0] < 0):
-            color = 'gray'
-            speed = 'NaN'
-        else:
-            w_vol = vdInfo[['MotorVolume','SmallCarVolume','LargeCarVolume','TruckCarVolume']]
-            w_speed = vdInfo[['MotorSpeed','SmallCarSpeed','LargeCarSpeed','TruckCarSpeed']]
-            speed = (w_vol.to_numpy() * w_speed.to_numpy()).sum() / totalVolume
-            # 國道
-            if (vdInfo['RoadClass'][0] == 0):
-                if (speed >= 0) and (speed <= 20):
-                    color = 'purple'
-                elif (speed > 20) and (speed <= 40):
-                    color = 'red'
-                elif (speed > 40) and (speed <= 60):
-                    color = 'orange'
-                elif (speed > 60) and (speed <= 80):
-                    color = 'yellow'
-                elif (speed > 80):
-                    color = 'green'
-            
-            # 省道快速公路
-            elif (vdInfo['RoadClass'][0] == 1):
-                if (speed >= 0) and (speed <= 20):
-                    color = 'purple'
-                elif (speed > 20) and (speed <= 40):
-                    color = 'red'
-                elif (speed > 40) and (speed <= 60):
-                    color = 'orange'
-                elif (speed > 60) and (speed <= 80):
-                    color = 'yellow'
-                elif (speed > 80):
-                    color = 'green'
-            
-            # 市區快速道路
-            elif (vdInfo['RoadClass'][0] == 2):
-                if (speed >= 0) and (speed <= 20):
-                    color = 'purple'
-                elif (speed > 20) and (speed <= 40):
-                    color = 'red'
-                elif (speed > 40) and (speed <= 55):
-                    color = 'orange'
-                elif (speed > 55) and (speed <= 70):
-                    color = 'yellow'
-                elif (speed > 70):
-                    color = 'green'
-            
-            # 省道一般公路
-            elif (vdInfo['RoadClass'][0] == 3):
-                if (speed >= 0) and (speed <= 10):
-                    color = 'purple'
-                elif (speed > 10) and (speed <= 15):
-                    color = 'red'
-                elif (speed > 15) and (speed <= 25):
-                    color = 'orange'
-                elif (speed > 25) and (speed <= 40):
-                    color = 'yellow'
-                elif (speed > 40):
-                    color = 'green'
-            
-            # 市道、縣道
-            elif (vdInfo['RoadClass'][0] == 4):
-                if (speed >= 0) and (speed <= 10):
-                    color = 'purple'
-                elif (speed > 10) and (speed <= 15):
-                    color = 'red'
-                elif (speed > 15) and (speed <= 25):
-                    color = 'orange'
-                elif (speed > 25) and (speed <= 40):
-                    color = 'yellow'
-                elif (speed > 40):
-                    color = 'green'
-            
-            # 市區一般道路
-            elif (vdInfo['RoadClass'][0] == 6):
-                if (speed >= 0) and (speed <= 10):
-                    color = 'purple'
-                elif (speed > 10) and (speed <= 15):
-                    color = 'red'
-                elif (speed > 15) and (speed <= 25):
-                    color = 'orange'
-                elif (speed > 25) and (speed <= 40):
-                    color = 'yellow'
-                elif (speed > 40):
-                    color = 'green'
-            
-            speed = f"{speed:.2f}"
-    
-    # Volume equals zero
-    elif (totalVolume == 0):
-        if (vdInfo['Speed'][0] == 0) and (vdInfo['Occupancy'][0] == 0):
-            color = 'green'
-            # 國道
-            if (vdInfo['RoadClass'][0] == 0):
-                speed = f"{110:.2f}"
-            
-            # 省道快速公路
-            elif (vdInfo['RoadClass'][0] == 1):
-                speed = f"{90:.2f}"
-            
-            # 市區快速道路
-            elif (vdInfo['RoadClass'][0] == 2):
-                speed = f"{80:.2f}"
-            
-            # 省道一般公路
-            elif (vdInfo['RoadClass'][0] == 3):
-                speed = f"{65:.2f}"
-            
-            # 市道、縣道
-            elif (vdInfo['RoadClass'][0] == 4):
-                speed = f"{60:.2f}"
-            
-            # 市區一般道路
-            elif (vdInfo['RoadClass'][0] == 6):
-                speed = f"{60:.2f}"
-        
-        elif (vdInfo['Speed'][0] == 0) and (vdInfo['Occupancy'][0] != 0):
-            color = 'red'
-            speed = f"{vdInfo['Speed'][0]:.2f}"
-        else:
-            color = 'gray'
-            speed = 'NaN'
-    
-    # Volume is less than zero -> Error
-    else:
-        color = 'gray'
-        speed = 'NaN'
+VOLUMES = ['MotorVolume','SmallCarVolume','LargeCarVolume','TruckCarVolume']
+SPEEDS = ['MotorSpeed','SmallCarSpeed','LargeCarSpeed','TruckCarSpeed']
 
-    return color, speed
+# Free-flow speed & upper speed bounds (km/h) of the purple / red / orange / yellow buckets
+ROAD_CLASS_SPEEDS = pl.DataFrame(
+    [
+        (0, 110, 20, 40, 60, 80),   # 國道
+        (1, 90, 20, 40, 60, 80),    # 省道快速公路
+        (2, 80, 20, 40, 55, 70),    # 市區快速道路
+        (3, 65, 10, 15, 25, 40),    # 省道一般公路
+        (4, 60, 10, 15, 25, 40),    # 市道、縣道
+        (6, 60, 10, 15, 25, 40),    # 市區一般道路
+    ],
+    schema={'RoadClass': pl.Int64, 'FreeFlowSpeed': pl.Float64,
+            'PurpleMax': pl.Float64, 'RedMax': pl.Float64, 'OrangeMax': pl.Float64, 'YellowMax': pl.Float64},
+    orient='row'
+)
 
-def draw_vdMap():
-    init_point = (25.056583067116616, 121.54849732195152)
-    vdStc = realtime_crawler.response(client_id=client_id, client_secret=client_secret,
-                                      target='/VD', city='Taipei', fileformat='JSON')
-    vdStcDf = data.getVDStatic(contents=[vdStc.text],
-                               date=datetime.strftime(datetime.now().date(), '%Y-%m-%d'))
+
+@timed('vdmap_stage', labels={'stage': 'trafficSituation'}, records=len)
+def trafficSituation(vdInfo: pl.DataFrame) -> pl.DataFrame:
+    """ Add the map color & speed of every VD as `Color` / `TrafficSpeed` (null -> 'NaN')
+
+    The speed is the volume-weighted vehicle speed; without traffic it is the free-flow
+    speed of the RoadClass (or 0 when the lane is occupied). Rows the old per-row
+    classifier could not handle (unknown RoadClass, missing speeds) come out gray.
+    """
+    thresholds = ROAD_CLASS_SPEEDS.with_columns(pl.col('RoadClass').cast(vdInfo.schema['RoadClass']))
+    vdInfo = vdInfo.join(thresholds, on='RoadClass', how='left', maintain_order='left')
+
+    totalVolume = pl.sum_horizontal(pl.col(VOLUMES).cast(pl.Int64))
+    weighted = pl.col(VOLUMES[0]).cast(pl.Float64) * pl.col(SPEEDS[0]).cast(pl.Float64)
+    for volume, speed in zip(VOLUMES[1:], SPEEDS[1:]):
+        weighted = weighted + pl.col(volume).cast(pl.Float64) * pl.col(speed).cast(pl.Float64)
+    speed = weighted / totalVolume
+    laneSpeed, occupancy = pl.col('Speed').cast(pl.Float64), pl.col('Occupancy').cast(pl.Float64)
+    knownClass = pl.col('FreeFlowSpeed').is_not_null()
+
+    moving = (totalVolume > 0) & ((laneSpeed >= 0) & (occupancy >= 0)).fill_null(False) \
+        & knownClass & (speed >= 0).fill_null(False) & speed.is_not_nan()
+    freeFlow = (totalVolume == 0) & (laneSpeed == 0) & (occupancy == 0) & knownClass
+    jammed = (totalVolume == 0) & (laneSpeed == 0) & ((occupancy != 0) | occupancy.is_null())
+
+    color = (
+        pl.when(moving & (speed <= pl.col('PurpleMax'))).then(pl.lit('purple'))
+        .when(moving & (speed <= pl.col('RedMax'))).then(pl.lit('red'))
+        .when(moving & (speed <= pl.col('OrangeMax'))).then(pl.lit('orange'))
+        .when(moving & (speed <= pl.col('YellowMax'))).then(pl.lit('yellow'))
+        .when(moving).then(pl.lit('green'))
+        .when(freeFlow.fill_null(False)).then(pl.lit('green'))
+        .when(jammed.fill_null(False)).then(pl.lit('red'))
+        .otherwise(pl.lit('gray'))
+    )
+    trafficSpeed = (
+        pl.when(moving).then(speed)
+        .when(freeFlow.fill_null(False)).then(pl.col('FreeFlowSpeed'))
+        .when(jammed.fill_null(False)).then(laneSpeed)
+    )
+    return vdInfo.with_columns(
+        color.alias('Color'),
+        trafficSpeed.alias('TrafficSpeed'),
+    ).drop(thresholds.columns[1:])
+
+@timed('vdmap_stage', labels={'stage': 'load_vdInfo'}, records=len)
+def load_vdInfo() -> pl.DataFrame:
+    """ Current VD data of Taipei with its map color & speed """
+    # Static VD data & RoadClass come from the daily cache; only /Live/VD is fetched
     vdDyc = realtime_crawler.response(client_id=client_id, client_secret=client_secret,
                                       target='/Live/VD', city='Taipei', fileformat='JSON')
     vdDycDf = data.getVDDynamic(contents=[vdDyc.text])
-    linkInfo = link_crawler.response(client_id=client_id, client_secret=client_secret,
-                                     link_id=vdStcDf['DetectionLinkID'].to_list(),
-                                     target='/LinkID', fileformat='JSON')
-    linkInfoDf = data.getLinkInfo(contents=json.loads(linkInfo.text))
-    linkInfoDf = linkInfoDf[['LinkID','RoadClass']]
-    linkInfoDf = linkInfoDf.unique(subset=linkInfoDf.columns)
-
-    vdInfo = vdStcDf.join(
-        linkInfoDf,
-        how='left',
-        left_on='DetectionLinkID',
-        right_on='LinkID'
-    ).join(
-        vdDycDf,
-        how='left',
-        on='VDID'
-    )
+    vdInfo = static_cache.vd_index('Taipei').join(vdDycDf, how='left', on='VDID')
+    return trafficSituation(vdInfo)
+
 
+# Loads the VDs in view from /vd.geojson; circles are created once & only restyled afterwards
+VD_LAYER_JS = """
+(function() {
+    var map = %(map)s;
+    var layer = L.layerGroup().addTo(map);
+    var circles = {};
+    function info(p) {
+        return '<div style="font-size: 18px">'
+            + '設備編碼: ' + p.VDID + (p.BiDirectional === 1 ? ' [雙向偵測]' : ' [單向偵測]') + '<br>'
+            + '道路編號: ' + p.RoadID + '<br>'
+            + '道路名稱: ' + p.RoadName + '<br>'
+            + '座標: (' + p.PositionLat + ', ' + p.PositionLon + ')<br>'
+            + '時間平均速度: ' + p.Speed + ' km/h<br>'
+            + '資料更新時間: ' + p.DataCollectTime
+            + '</div>';
+    }
+    function load() {
+        var b = map.getBounds();
+        var bbox = [b.getWest(), b.getSouth(), b.getEast(), b.getNorth()].join(',');
+        fetch('vd.geojson?bbox=' + bbox).then(function(r) { return r.json(); }).then(function(fc) {
+            fc.features.forEach(function(f) {
+                var p = f.properties;
+                var circle = circles[p.VDID];
+                if (!circle) {
+                    circle = L.circle([p.PositionLat, p.PositionLon],
+                                      {radius: 50, fill: true, fillOpacity: 0.5}).addTo(layer);
+                    circles[p.VDID] = circle;
+                }
+                circle.setStyle({color: p.Color});
+                circle.bindPopup(info(p), {maxWidth: 400});
+            });
+        });
+    }
+    map.whenReady(load);
+    map.on('moveend', load);
+    setInterval(load, %(interval)d);
+})();
+"""
+
+@timed('vdmap_stage', labels={'stage': 'draw_vdMap'})
+def draw_vdMap(interval: float = 60.0) -> folium.Map:
+    """ The base map; its VD layer is fetched & restyled by the page every `interval` seconds """
+    init_point = (25.056583067116616, 121.54849732195152)
     vdMap = folium.Map(location=init_point, zoom_start=30, tiles='CartoDB positron')
-    for i in range(vdInfo.shape[0]):
-        color, speed = trafficSituation(vdInfo[i])
-        info  = '<div style="font-size: 18px">'
-        if (vdInfo['BiDirectional'][i] == 1):
-            info += f"設備編碼: {vdInfo['VDID'][i]} [雙向偵測]<br>"
-        else:
-            info += f"設備編碼: {vdInfo['VDID'][i]} [單向偵測]<br>"
-        info += f"道路編號: {vdInfo['RoadID'][i]}<br>"
-        info += f"道路名稱: {vdInfo['RoadName'][i]}<br>"
-        info += f"座標: ({vdInfo['PositionLat'][i]}, {vdInfo['PositionLon'][i]})<br>"
-        info += f"時間平均速度: {speed} km/h<br>"
-        info += f"資料更新時間: {vdInfo['DataCollectTime'][i]}"
-        info += '</div>'
-        
-        folium.Circle(
-            location=(vdInfo['PositionLat'][i], vdInfo['PositionLon'][i]),
-            color=color,
-            radius=50,
-            popup=folium.Popup(info, max_width=400),
-            fill=True,
-            fill_opacity=0.5
-        ).add_to(vdMap)
-    
+    vdMap.get_root().script.add_child(folium.Element(
+        VD_LAYER_JS % {'map': vdMap.get_name(), 'interval': int(interval * 1000)}
+    ))
     return vdMap
 
 
+class GridIndex:
+    """ Uniform lat/lon grid over VD positions, answering bounding-box queries """
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, cell: float = 0.01) -> None:
+        self.lat = lat
+        self.lon = lon
+        self.cell = cell
+        rows = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        self.cells = {}
+        if (len(rows) == 0):
+            return
+        keys = np.stack([np.floor(lat[rows] / cell), np.floor(lon[rows] / cell)], axis=1).astype(np.int64)
+        cells, inverse = np.unique(keys, axis=0, return_inverse=True)
+        order = np.argsort(inverse.ravel(), kind='stable')
+        bounds = np.searchsorted(inverse.ravel()[order], np.arange(len(cells) + 1))
+        for i, (y, x) in enumerate(cells):
+            self.cells[(int(y), int(x))] = rows[order[bounds[i]:bounds[i + 1]]]
+
+    def query(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> np.ndarray:
+        """ Sorted row numbers of the VDs inside the box """
+        y0, y1 = int(np.floor(min_lat / self.cell)), int(np.floor(max_lat / self.cell))
+        x0, x1 = int(np.floor(min_lon / self.cell)), int(np.floor(max_lon / self.cell))
+        if ((y1 - y0 + 1) * (x1 - x0 + 1) <= len(self.cells)):
+            candidates = [self.cells[(y, x)] for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)
+                          if ((y, x) in self.cells)]
+        else:
+            # A box larger than the covered area: scanning the occupied cells is cheaper
+            candidates = [rows for (y, x), rows in self.cells.items() if (y0 <= y <= y1) and (x0 <= x <= x1)]
+        if (not candidates):
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate(candidates)
+        lat, lon = self.lat[rows], self.lon[rows]
+        return np.sort(rows[(lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)])
+
+
+@timed('vdmap_stage', labels={'stage': 'render_page'})
+def render_vdMap() -> 'MapSnapshot':
+    """ The base map rendered to HTML, ready to serve """
+    return MapSnapshot(draw_vdMap()._repr_html_())
+
+
+class MapSnapshot:
+    """ A rendered map page, compressed once & served as-is to every viewer """
+    def __init__(self, html: str) -> None:
+        self.body = html.encode('utf-8')
+        self.gzip_body = gzip.compress(self.body, compresslevel=6)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class VDSnapshot:
+    """ One refresh of the VD layer: a GeoJSON feature per VD & a grid index over them """
+    @timed('vdmap_stage', labels={'stage': 'render'})
+    def __init__(self, vdInfo: pl.DataFrame, cell: float = 0.01) -> None:
+        self.features = []
+        for vd in vdInfo.iter_rows(named=True):
+            self.features.append(json.dumps({
+                'type': 'Feature',
+                'geometry': None if (vd['PositionLat'] is None) or (vd['PositionLon'] is None) else
+                            {'type': 'Point', 'coordinates': [vd['PositionLon'], vd['PositionLat']]},
+                'properties': {
+                    'VDID': vd['VDID'],
+                    'BiDirectional': vd['BiDirectional'],
+                    'RoadID': vd['RoadID'],
+                    'RoadName': vd['RoadName'],
+                    'PositionLat': vd['PositionLat'],
+                    'PositionLon': vd['PositionLon'],
+                    'Color': vd['Color'],
+                    'Speed': 'NaN' if (vd['TrafficSpeed'] is None) else f"{vd['TrafficSpeed']:.2f}",
+                    'DataCollectTime': None if (vd['DataCollectTime'] is None) else str(vd['DataCollectTime']),
+                },
+            }, ensure_ascii=False))
+        self.grid = GridIndex(vdInfo['PositionLat'].cast(pl.Float64).fill_null(np.nan).to_numpy(),
+                              vdInfo['PositionLon'].cast(pl.Float64).fill_null(np.nan).to_numpy(), cell)
+        # The whole city is what a freshly opened page asks for, so keep it pre-compressed
+        self.body = self.geojson()
+        self.gzip_body = gzip.compress(self.body, compresslevel=6)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def geojson(self, rows: np.ndarray = None) -> bytes:
+        features = self.features if (rows is None) else [self.features[i] for i in rows]
+        return ('{"type":"FeatureCollection","features":[' + ','.join(features) + ']}').encode('utf-8')
+
+
+class SnapshotRefresher:
+    """ Rebuild a snapshot in a background thread on the feed's one-minute cadence
+
+    A new snapshot is built off to the side and swapped in with a single assignment, so
+    readers always see a complete one. A failed refresh keeps the previous snapshot.
+    """
+    def __init__(self, build: callable, interval: float = 60.0) -> None:
+        self.build = build
+        self.interval = interval
+        self.snapshot = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='snapshot-refresher', daemon=True)
+
+    def start(self) -> 'SnapshotRefresher':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def refresh(self) -> any:
+        snapshot = self.build()
+        self.snapshot = snapshot
+        self._ready.set()
+        return snapshot
+
+    def wait(self, timeout: float = None) -> any:
+        """ The current snapshot, waiting up to `timeout` seconds for the first one """
+        self._ready.wait(timeout)
+        return self.snapshot
+
+    def _run(self) -> None:
+        nextRun = time.monotonic()
+        while (not self._stop.is_set()):
+            try:
+                self.refresh()
+            except Exception:
+                app.logger.exception('Refresh failed, still serving the previous snapshot')
+            # Keep the cadence; a build slower than the interval is followed immediately
+            nextRun = max(nextRun + self.interval, time.monotonic())
+            self._stop.wait(nextRun - time.monotonic())
+
+
+def cachedResponse(body: bytes, gzip_body: bytes, etag: str, last_modified: datetime, mimetype: str) -> Response:
+    """ Serve `body` (gzipped if accepted) with validators, answering 304 when they match """
+    useGzip = request.accept_encodings['gzip'] > 0
+    if (useGzip) and (gzip_body is None):
+        gzip_body = gzip.compress(body, compresslevel=6)
+    response = Response(gzip_body if (useGzip) else body, mimetype=mimetype)
+    if (useGzip):
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f"{etag}-gzip" if (useGzip) else etag)
+    response.last_modified = last_modified
+    # Clients may keep the response but must revalidate, which costs a 304 at most
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @app.route('/', methods=['GET'])
 def index():
-    vdMap = draw_vdMap()
-    return vdMap._repr_html_()
+    return cachedResponse(page.body, page.gzip_body, page.etag, page.last_modified, 'text/html')
+
+
+@app.route('/vd.geojson', methods=['GET'])
+def vd_geojson():
+    """ VDs as GeoJSON, optionally limited to ?bbox=min_lon,min_lat,max_lon,max_lat """
+    snapshot = refresher.wait(timeout=30)
+    if (snapshot is None):
+        return Response('VD data is not ready yet.', status=503, headers={'Retry-After': '5'})
+
+    bbox = request.args.get('bbox')
+    if (bbox is None):
+        return cachedResponse(snapshot.body, snapshot.gzip_body, snapshot.etag, snapshot.last_modified,
+                              'application/geo+json')
+    try:
+        min_lon, min_lat, max_lon, max_lat = map(float, bbox.split(','))
+    except ValueError:
+        return Response("bbox must be 'min_lon,min_lat,max_lon,max_lat'.", status=400)
+    if (not all(map(math.isfinite, (min_lon, min_lat, max_lon, max_lat)))):
+        return Response('bbox must be finite.', status=400)
+    # Clamped to valid coordinates, so huge values cannot blow up the grid lookup
+    min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 180.0)
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    body = snapshot.geojson(snapshot.grid.query(min_lon, min_lat, max_lon, max_lat))
+    return cachedResponse(body, None, snapshot.etag, snapshot.last_modified, 'application/geo+json')
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """ Latencies, bytes, record counts & cache hit rates in the Prometheus text format (see --metrics) """
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('-i', '--id', help='client_id')
     parser.add_argument('-s', '--secret', help='client_secret')
+    parser.add_argument('--metrics', action='store_true', help='record timings for /metrics')
     args = parser.parse_args()
+    if (args.metrics):
+        REGISTRY.enable()
     
     client_id, client_secret = args.id, args.secret
     realtime_crawler = RealTimeRoadInfoCrawler()
     link_crawler = LinkInfoCrawler()
+    static_cache = StaticCache(client_id, client_secret, crawler=realtime_crawler, link_crawler=link_crawler)
+    REGISTRY.register_cache('vd_static', lambda: static_cache.stats, 'static_hits', 'static_misses')
+    REGISTRY.register_cache('link', lambda: static_cache.stats, 'link_hits', 'link_misses')
+    page = render_vdMap()
+    refresher = SnapshotRefresher(lambda: VDSnapshot(load_vdInfo())).start()
     
-    app.run(port=54088)
+    app.run(port=54088, threaded=True)
@@ -0,0 +1,219 @@
+import os
+import time
+import sqlite3
+import argparse
+import pandas as pd
+from datetime import date, datetime, timedelta
+from .crawler import Crawler, HistRoadInfoCrawler, TDXAPIError
+
+
+# The historical API accepts 'YYYY-mm-dd' or 'YYYY-mm-dd~YYYY-mm-dd' (At most 7 days)
+MAX_WINDOW_DAYS = 7
+# Windows never cross a block of MAX_WINDOW_DAYS days counted from this Monday, so the
+# same day always lands in the same window however the requested range is extended
+WINDOW_EPOCH = date(1970, 1, 5)
+
+CITY_NAMES = {
+    'Taipei': '臺北市',
+    'NewTaipei': '新北市',
+    'Taoyuan': '桃園市',
+    'Taichung': '臺中市',
+    'Tainan': '臺南市',
+    'Kaohsiung': '高雄市',
+    'Keelung': '基隆市',
+    'ChanghuaCounty': '彰化縣',
+    'YunlinCounty': '雲林縣',
+    'PingtungCounty': '屏東縣',
+    'YilanCounty': '宜蘭縣',
+    'TaitungCounty': '臺東縣',
+}
+
+_VD_CITIES = ('Taipei', 'NewTaipei', 'Taoyuan', 'Taichung', 'Tainan', 'Kaohsiung',
+              'Keelung', 'YilanCounty', 'TaitungCounty')
+_SECTION_CITIES = ('Taipei', 'NewTaipei', 'Taoyuan', 'Taichung', 'Tainan', 'Keelung',
+                   'ChanghuaCounty', 'YilanCounty')
+_CONGESTION_CITIES = ('Taipei', 'NewTaipei', 'Taoyuan', 'Taichung', 'Tainan', 'Kaohsiung',
+                      'Keelung', 'ChanghuaCounty', 'YunlinCounty', 'PingtungCounty', 'YilanCounty')
+
+# target: (file title, supported cities)
+HIST_TARGETS = {
+    '/VD': ('車輛偵測器歷史資料', _VD_CITIES),
+    '/Live/VD': ('車輛偵測器即時路況歷史資料', _VD_CITIES),
+    '/Section': ('發佈路段歷史資料', _SECTION_CITIES),
+    '/Live': ('發佈路段即時路況歷史資料', _SECTION_CITIES),
+    '/SectionLink': ('發佈路段之基礎路段組合歷史資料', _SECTION_CITIES),
+    '/SectionShape': ('發佈路段線型圖資歷史資料', _SECTION_CITIES),
+    '/CongestionLevel': ('路況壅塞水準歷史資料', _CONGESTION_CITIES),
+}
+
+
+def plan_windows(dates: list, max_days: int = MAX_WINDOW_DAYS) -> list:
+    """ Merge dates into runs of consecutive days within fixed `max_days` blocks, newest first """
+    days = sorted({datetime.strptime(date, '%Y-%m-%d').date() for date in dates}, reverse=True)
+    windows = []
+    for day in days:
+        if (windows) and (windows[-1][0] - day == timedelta(days=1)) \
+                and (_block(windows[-1][0], max_days) == _block(day, max_days)):
+            windows[-1][0] = day
+        else:
+            windows.append([day, day])
+
+    return [
+        start.isoformat() if (start == end) else f"{start.isoformat()}~{end.isoformat()}"
+        for start, end in windows
+    ]
+
+
+def window_dates(window: str) -> list:
+    """ 'YYYY-mm-dd' or 'YYYY-mm-dd~YYYY-mm-dd' -> the dates it covers """
+    start, _, end = window.partition('~')
+    return [datetime.strftime(x, '%Y-%m-%d') for x in pd.date_range(start, end or start)]
+
+
+def _block(day: date, max_days: int) -> int:
+    return (day - WINDOW_EPOCH).days // max_days
+
+
+class BackfillJobStore:
+    """ Persistent SQLite job table, so an interrupted backfill resumes where it stopped """
+    def __init__(self, path: str) -> None:
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                target TEXT NOT NULL,
+                city TEXT NOT NULL,
+                dates TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                bytes INTEGER,
+                error TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (target, city, dates)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def add(self, jobs: list) -> int:
+        """ Insert (target, city, dates) jobs, ignoring ones already known """
+        before = self.conn.total_changes
+        self.conn.executemany('INSERT OR IGNORE INTO jobs (target, city, dates) VALUES (?, ?, ?)', jobs)
+        self.conn.commit()
+        return self.conn.total_changes - before
+
+    def windows(self, target: str, city: str) -> list:
+        return [row[0] for row in self.conn.execute(
+            'SELECT dates FROM jobs WHERE target = ? AND city = ?', (target, city)
+        )]
+
+    def pending(self, max_attempts: int) -> list:
+        # 'running' jobs were interrupted by a crash and are picked up again
+        return self.conn.execute(
+            "SELECT target, city, dates FROM jobs WHERE status != 'done' AND attempts < ? "
+            "ORDER BY dates DESC, target, city",
+            (max_attempts,)
+        ).fetchall()
+
+    def mark(self, job: tuple, status: str, nbytes: int = None, error: str = None) -> None:
+        attempts = 'attempts + 1' if (status == 'running') else 'attempts'
+        self.conn.execute(
+            f"UPDATE jobs SET status = ?, attempts = {attempts}, bytes = ?, error = ?, updated_at = ? "
+            "WHERE target = ? AND city = ? AND dates = ?",
+            (status, nbytes, error, datetime.now().isoformat(timespec='seconds'), *job)
+        )
+        self.conn.commit()
+
+    def summary(self) -> dict:
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class Backfill:
+    """ Download historical TDX data in <=7-day windows per target & city """
+    def __init__(self,
+                 client_id: str,
+                 client_secret: str,
+                 filedir: str,
+                 db_path: str = None,
+                 crawler: Crawler = None,
+                 compression: str = None,
+                 max_attempts: int = 3) -> None:
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.filedir = filedir
+        self.crawler = crawler if (crawler) else HistRoadInfoCrawler()
+        self.compression = compression
+        self.max_attempts = max_attempts
+        os.makedirs(filedir, exist_ok=True)
+        self.jobs = BackfillJobStore(db_path if (db_path) else os.path.join(filedir, 'backfill.sqlite3'))
+
+    def plan(self, date_start: str, date_end: str, targets: list = None, cities: list = None) -> int:
+        """ Register jobs for every supported (target, city, window); return how many are new
+
+        Days already covered by a known job of the same target & city are left out, so
+        re-planning an extended or overlapping range never downloads a day twice.
+        """
+        dates = [datetime.strftime(x, '%Y-%m-%d') for x in pd.date_range(date_start, date_end)]
+        jobs = []
+        for target in (targets if (targets) else HIST_TARGETS):
+            supported = HIST_TARGETS[target][1]
+            for city in (cities if (cities) else supported):
+                if (city in supported):
+                    covered = {day for window in self.jobs.windows(target, city) for day in window_dates(window)}
+                    windows = plan_windows([day for day in dates if (day not in covered)])
+                    jobs.extend((target, city, window) for window in windows)
+        return self.jobs.add(jobs)
+
+    def filename(self, target: str, city: str) -> str:
+        return f"{CITY_NAMES.get(city, city)}{HIST_TARGETS[target][0]}"
+
+    def run(self) -> dict:
+        """ Run all unfinished jobs, printing progress & throughput """
+        jobs = self.jobs.pending(self.max_attempts)
+        started = time.monotonic()
+        total_bytes = 0
+        for i, job in enumerate(jobs, start=1):
+            target, city, dates = job
+            filename = self.filename(target, city)
+            self.jobs.mark(job, 'running')
+            try:
+                if (self.crawler.is_downloaded(self.filedir, dates, filename, 'JSON', self.compression)):
+                    path = self.crawler.download_path(self.filedir, dates, filename, 'JSON', self.compression)
+                else:
+                    rtn = self.crawler.response(client_id=self.client_id, client_secret=self.client_secret,
+                                                target=target, date=dates, city=city,
+                                                fileformat='JSON', stream=True)
+                    path = self.crawler.download(rtn, self.filedir, dates, filename, fileformat='JSON',
+                                                 compression=self.compression)
+                    total_bytes += os.path.getsize(path)
+                self.jobs.mark(job, 'done', nbytes=os.path.getsize(path))
+                status = 'done'
+            except (TDXAPIError, OSError) as e:
+                self.jobs.mark(job, 'failed', error=str(e))
+                status = f"failed ({e})"
+
+            elapsed = max(time.monotonic() - started, 1e-9)
+            print(f"[{i}/{len(jobs)}] {city} {target} {dates}: {status} | "
+                  f"{i / elapsed * 60:.1f} jobs/min, {total_bytes / elapsed / 2**20:.2f} MiB/s")
+
+        return self.jobs.summary()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--id', help='client_id')
+    parser.add_argument('-s', '--secret', help='client_secret')
+    parser.add_argument('--start', default='2024-04-19', help='first date (YYYY-mm-dd)')
+    parser.add_argument('--end', default='2024-04-19', help='last date (YYYY-mm-dd)')
+    parser.add_argument('--city', action='append', help='City, e.g. Taipei (repeatable)')
+    parser.add_argument('--target', action='append', help='target, e.g. /Live/VD (repeatable)')
+    parser.add_argument('--filedir', default='./trafficData')
+    parser.add_argument('--compression', choices=['gzip', 'zstd'])
+    args = parser.parse_args()
+
+    backfill = Backfill(args.id, args.secret, args.filedir, compression=args.compression)
+    print(f"{backfill.plan(args.start, args.end, args.target, args.city or ['Taipei'])} new jobs planned")
+    print(backfill.run())
@@ -0,0 +1,157 @@
+import os
+import json
+import sqlite3
+import threading
+import polars as pl
+from datetime import datetime, timedelta
+from .crawler import RealTimeRoadInfoCrawler, LinkInfoCrawler
+from .store import write_parquet_atomic
+from . import data
+
+
+class StaticCache:
+    """ Disk cache of the slowly changing TDX data: VD static records & link attributes
+
+    VD static data changes at most daily, so it is kept as one Parquet file per city and
+    re-downloaded once it is older than `ttl` or was fetched before today. Link attributes
+    live in SQLite; only LinkIDs not seen within `ttl` are POSTed to /LinkID. On top of
+    both, `vd_index` keeps the static data joined with RoadClass, so a per-minute refresh
+    needs just the /Live/VD call & one join on VDID.
+
+        <root>/vd_static/<City>.parquet
+        <root>/vd_index/<City>.parquet
+        <root>/links.sqlite3
+    """
+    def __init__(self,
+                 client_id: str,
+                 client_secret: str,
+                 root: str = './tdxCache',
+                 ttl: timedelta = timedelta(days=1),
+                 crawler: RealTimeRoadInfoCrawler = None,
+                 link_crawler: LinkInfoCrawler = None,
+                 link_batch_size: int = 1000) -> None:
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.root = root
+        self.ttl = ttl
+        self.crawler = crawler if (crawler) else RealTimeRoadInfoCrawler()
+        self.link_crawler = link_crawler if (link_crawler) else LinkInfoCrawler()
+        self.link_batch_size = link_batch_size
+        self.stats = {'static_hits': 0, 'static_misses': 0, 'link_hits': 0, 'link_misses': 0}
+        self._indexes = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, 'vd_static'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'vd_index'), exist_ok=True)
+        # Used from the refresher thread of the demo as well, hence the shared lock
+        self.conn = sqlite3.connect(os.path.join(root, 'links.sqlite3'), check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS links (
+                LinkID TEXT PRIMARY KEY,
+                RoadClass INTEGER,
+                record TEXT,
+                fetched_at TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def is_fresh(self, fetched_at: datetime) -> bool:
+        now = datetime.now()
+        return (now - fetched_at < self.ttl) and (fetched_at.date() == now.date())
+
+    def vd_static(self, city: str) -> pl.DataFrame:
+        """ getVDStatic output of a city, from disk unless it has expired """
+        path = os.path.join(self.root, 'vd_static', f"{city}.parquet")
+        with self._lock:
+            if (os.path.exists(path)) and (self.is_fresh(datetime.fromtimestamp(os.path.getmtime(path)))):
+                self.stats['static_hits'] += 1
+                return pl.read_parquet(path)
+
+            self.stats['static_misses'] += 1
+            rtn = self.crawler.response(client_id=self.client_id, client_secret=self.client_secret,
+                                        target='/VD', city=city, fileformat='JSON')
+            vdStatic = data.getVDStatic(contents=[rtn.text], date=datetime.now().strftime('%Y-%m-%d'))
+            write_parquet_atomic(vdStatic, path)
+            return vdStatic
+
+    def link_road_class(self, link_ids: list) -> pl.DataFrame:
+        """ (LinkID, RoadClass) of `link_ids`; RoadClass is null for links unknown to TDX """
+        link_ids = sorted({link_id for link_id in link_ids if (link_id is not None)})
+        with self._lock:
+            known = self._known_links(link_ids)
+            missing = [link_id for link_id in link_ids if (link_id not in known)]
+            self.stats['link_hits'] += len(link_ids) - len(missing)
+            self.stats['link_misses'] += len(missing)
+            for i in range(0, len(missing), self.link_batch_size):
+                self._fetch_links(missing[i:i + self.link_batch_size])
+
+            rows = []
+            for i in range(0, len(link_ids), 500):
+                batch = link_ids[i:i + 500]
+                rows += self.conn.execute(
+                    f"SELECT LinkID, RoadClass FROM links WHERE LinkID IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+        return pl.DataFrame(rows, schema={'LinkID': pl.String, 'RoadClass': pl.Int64}, orient='row')
+
+    def vd_index(self, city: str) -> pl.DataFrame:
+        """ VD static data of a city with the RoadClass of its DetectionLinkID
+
+        Rebuilt when the static data changes, and once the RoadClass it holds has expired
+        like the links it came from.
+        """
+        vdStatic = self.vd_static(city)
+        path = os.path.join(self.root, 'vd_index', f"{city}.parquet")
+        staticTime = vdStatic['UpdateTime'].max()
+        cached = self._indexes.get(city)
+        if (cached is not None) and (cached[0] == staticTime) and (self.is_fresh(cached[1])):
+            return cached[2]
+        if (os.path.exists(path)):
+            builtAt = datetime.fromtimestamp(os.path.getmtime(path))
+            if (self.is_fresh(builtAt)):
+                index = pl.read_parquet(path)
+                if (index.height == vdStatic.height) and (index['UpdateTime'].max() == staticTime):
+                    self._indexes[city] = (staticTime, builtAt, index)
+                    return index
+
+        roadClass = self.link_road_class(vdStatic['DetectionLinkID'].cast(pl.String).to_list())
+        index = vdStatic.join(
+            roadClass.with_columns(pl.col('LinkID').cast(pl.Categorical)),
+            how='left',
+            left_on='DetectionLinkID',
+            right_on='LinkID',
+            maintain_order='left'
+        )
+        write_parquet_atomic(index, path)
+        self._indexes[city] = (staticTime, datetime.now(), index)
+        return index
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _known_links(self, link_ids: list) -> set:
+        oldest = datetime.now() - self.ttl
+        known = set()
+        for i in range(0, len(link_ids), 500):
+            batch = link_ids[i:i + 500]
+            known.update(row[0] for row in self.conn.execute(
+                f"SELECT LinkID FROM links WHERE fetched_at > ? AND LinkID IN ({','.join('?' * len(batch))})",
+                [oldest.isoformat(timespec='seconds'), *batch]
+            ))
+        return known
+
+    def _fetch_links(self, link_ids: list) -> None:
+        rtn = self.link_crawler.response(client_id=self.client_id, client_secret=self.client_secret,
+                                         link_id=link_ids, target='/LinkID', fileformat='JSON')
+        records = {record['LinkID']: record for record in json.loads(rtn.text)}
+        fetchedAt = datetime.now().isoformat(timespec='seconds')
+        # Links missing from the response are stored too, so they are not asked for again
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO links (LinkID, RoadClass, record, fetched_at) VALUES (?, ?, ?, ?)',
+            [
+                (link_id, records[link_id].get('RoadClass'), json.dumps(records[link_id], ensure_ascii=False), fetchedAt)
+                if (link_id in records) else (link_id, None, None, fetchedAt)
+                for link_id in link_ids
+            ]
+        )
+        self.conn.commit()
@@ -1,26 +1,288 @@
-import pandas as pd
+import os
+import gzip
 import json
+import time
+import hashlib
+import tempfile
+import random
+import asyncio
+import weakref
+import threading
 import requests
-from datetime import datetime
+from typing import Iterator
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from .metrics import REGISTRY, timed
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# File suffixes of the supported download compressions
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+# Read once at import: os.umask can only be queried by setting it, which races with
+# threads creating files
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def chmod_default(fd: int) -> None:
+    """ Give a tempfile.mkstemp file (0600) the mode open() would have created it with """
+    os.fchmod(fd, 0o666 & ~_UMASK)
+
+
+def open_compressed(path: str, mode: str = 'rb', compression: str = 'infer') -> any:
+    """ Open a plain, gzip or zstd file; `compression='infer'` picks it from the suffix """
+    if (compression == 'infer'):
+        compression = next((c for c, suffix in COMPRESSION_SUFFIXES.items() if (c) and (path.endswith(suffix))), None)
+    if (compression is None):
+        return open(path, mode)
+    elif (compression == 'gzip'):
+        return gzip.open(path, mode)
+    elif (compression == 'zstd'):
+        if (zstandard is None):
+            raise ImportError("Compression 'zstd' requires the 'zstandard' package.")
+        return zstandard.open(path, mode)
+    else:
+        raise ValueError(f"'{compression}' is not defined.")
+
+
+class _HashingWriter:
+    """ File-like wrapper hashing and counting the bytes that reach the disk """
+    def __init__(self, f: any) -> None:
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, b: bytes) -> int:
+        self.sha256.update(b)
+        self.size += len(b)
+        return self.f.write(b)
+
+    def flush(self) -> None:
+        self.f.flush()
+
+
+class TokenManager:
+    """ Thread-safe cache of TDX access tokens, shared by all crawlers """
+    def __init__(self, refresh_ahead: float = 60.0, timeout: float = 10.0, wait_timeout: float = 60.0) -> None:
+        # Seconds before expiry at which a cached token is refreshed in the background
+        self.refresh_ahead = refresh_ahead
+        # Callers joining an in-flight fetch give up after `wait_timeout` seconds
+        self.wait_timeout = wait_timeout
+        self.timeout = timeout
+        self._session = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._tokens = {}
+        self._errors = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, auth_url: str, client_id: str, client_secret: str) -> str:
+        """ Return a cached token, fetching (or joining an in-flight fetch) on a miss """
+        key = (auth_url, client_id)
+        with self._lock:
+            cached = self._tokens.get(key)
+            now = time.monotonic()
+            if (cached) and (now < cached[1]):
+                self.hits += 1
+                if (now >= cached[1] - self.refresh_ahead) and (key not in self._inflight):
+                    self._inflight[key] = threading.Event()
+                    threading.Thread(target=self._refresh,
+                                     args=(key, auth_url, client_id, client_secret),
+                                     daemon=True).start()
+                return cached[0]
+            self.misses += 1
+            event = self._inflight.get(key)
+            owner = event is None
+            if (owner):
+                event = threading.Event()
+                self._inflight[key] = event
+
+        if (owner):
+            self._refresh(key, auth_url, client_id, client_secret)
+        elif (not event.wait(self.wait_timeout)):
+            raise RuntimeError(f"Timed out waiting for the access token of client_id '{client_id}'.")
+
+        with self._lock:
+            cached = self._tokens.get(key)
+            if (cached) and (time.monotonic() < cached[1]):
+                return cached[0]
+            error = self._errors.get(key)
+        raise RuntimeError(f"Failed to get access token for client_id '{client_id}'.") from error
+
+    def invalidate(self, auth_url: str, client_id: str) -> None:
+        """ Drop the cached token, e.g. after the API server rejected it """
+        with self._lock:
+            self._tokens.pop((auth_url, client_id), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'refreshes': self.refreshes}
+
+    @property
+    def session(self) -> 'HTTPSession':
+        # Created on first use: HTTPSession is defined below & tokens may never be needed
+        with self._lock:
+            if (self._session is None):
+                self._session = HTTPSession(pool_size=2, timeout=self.timeout)
+            return self._session
+
+    def _refresh(self, key: tuple, auth_url: str, client_id: str, client_secret: str) -> None:
+        try:
+            # Retries 429/5xx & raises TDXAPIError on any other failed status
+            auth_response = self.session.request(
+                'post',
+                auth_url,
+                data={
+                    'client_id': client_id,
+                    'client_secret': client_secret,
+                    'content_type': 'application/x-www-form-urlencoded',
+                    'grant_type': 'client_credentials'
+                }
+            )
+            auth_info = json.loads(auth_response.text)
+            if ('access_token' not in auth_info):
+                raise TDXAPIError('No access_token in the auth response', auth_url, auth_response.status_code,
+                                  auth_response)
+            token = auth_info['access_token']
+            expires_at = time.monotonic() + float(auth_info.get('expires_in', 0))
+            with self._lock:
+                self._tokens[key] = (token, expires_at)
+                self._errors.pop(key, None)
+                self.refreshes += 1
+        except Exception as e:
+            with self._lock:
+                self._errors[key] = e
+        finally:
+            with self._lock:
+                event = self._inflight.pop(key)
+            event.set()
+
+
+class TDXAPIError(RuntimeError):
+    """ Raised when the TDX API server does not return successfully """
+    def __init__(self, message: str, url: str, status_code: int = None,
+                 response: requests.models.Response = None) -> None:
+        super().__init__(f"{message} (status_code={status_code}, url={url})")
+        self.message = message
+        self.url = url
+        self.status_code = status_code
+        self.response = response
+
+
+class HTTPSession:
+    """ Pooled keep-alive HTTP session retrying 429/5xx with jittered exponential backoff """
+    retry_status = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self,
+                 pool_size: int = 10,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 backoff_max: float = 60.0,
+                 timeout: float = 30.0) -> None:
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip'})
+
+    def request(self, method: str, url: str, on_unauthorized: callable = None, **kwargs) -> requests.models.Response:
+        """ Send a request, retrying transient failures; raise TDXAPIError otherwise """
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        reauthorized = False
+        while True:
+            try:
+                rtn = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                if (attempt >= self.max_retries):
+                    raise TDXAPIError(f"{type(e).__name__}: {e}", url) from e
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            # The cached token may have been revoked; fetch a new one once
+            if (rtn.status_code == 401) and (on_unauthorized) and (not reauthorized):
+                rtn.close()
+                on_unauthorized()
+                reauthorized = True
+                continue
+
+            if (rtn.status_code in self.retry_status) and (attempt < self.max_retries):
+                delay = self._retry_after(rtn)
+                rtn.close()
+                time.sleep(self._backoff(attempt) if delay is None else delay)
+                attempt += 1
+                continue
+
+            if (rtn.status_code >= 400):
+                raise TDXAPIError(rtn.reason or 'Request failed', url, rtn.status_code, rtn)
+            return rtn
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def _retry_after(self, rtn: requests.models.Response) -> float:
+        value = rtn.headers.get('Retry-After')
+        if (value is None):
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), self.backoff_max)
+
+
+def _response_labels(arguments: dict) -> dict:
+    method = 'post' if (type(arguments['link_id']) == list) else arguments['method']
+    return {'target': arguments['target'], 'method': method}
+
+
+def _response_bytes(rtn: requests.models.Response) -> int:
+    # Body bytes on the wire (compressed if the server compressed them), from Content-Length
+    # only; responses without one, e.g. chunked historical files, count as 0
+    length = rtn.headers.get('Content-Length', '')
+    return int(length) if (length.isdigit()) else 0
 
 
 class Crawler:
-    def __init__(self) -> None:
+    # Shared by every subclass so that all crawlers reuse the same cached tokens
+    token_manager = TokenManager()
+
+    def __init__(self,
+                 pool_size: int = 10,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 timeout: float = 30.0) -> None:
         self.api_url = 'https://tdx.transportdata.tw/api/'
         self.auth_url = 'https://tdx.transportdata.tw/auth/realms/TDXConnect/protocol/openid-connect/token'
+        self.session = HTTPSession(pool_size=pool_size, max_retries=max_retries,
+                                   backoff_factor=backoff_factor, timeout=timeout)
         
+    @timed('tdx_token')
     def get_token(self, client_id: str, client_secret: str) -> str:
-        auth_response = requests.post(
-            self.auth_url,
-            {
-                'client_id': client_id,
-                'client_secret': client_secret,
-                'content_type': 'application/x-www-form-urlencoded',
-                'grant_type': 'client_credentials'
-            }
-        )
-        return json.loads(auth_response.text)['access_token']
+        return self.token_manager.get_token(self.auth_url, client_id, client_secret)
 
+    @timed('tdx_request', labels=_response_labels, size=_response_bytes)
     def response(self,
                  client_id: str,
                  client_secret: str,
@@ -34,154 +296,310 @@ class Crawler:
                  rail_operator: str = None,
                  airport: str = None,
                  link_id: any = None,
-                 method: str = 'get') -> requests.models.Response:
+                 method: str = 'get',
+                 stream: bool = False) -> requests.models.Response:
         """ Raise request to TDX API Server & return response """
-        argcount = 0
         if (city):
-            target += f"/City/{city}?"
+            target += f"/City/{city}"
         elif (authority):
-            target += f"/{authority}?"
+            target += f"/{authority}"
         elif (rail_operator):
-            target += f"/Rail/{rail_operator}?"
+            target += f"/Rail/{rail_operator}"
         elif (airport):
-            target += f"/Air/Airport/{airport}?"
+            target += f"/Air/Airport/{airport}"
         elif (link_id):
             if (type(link_id) == str):
-                target += f"/{link_id}?"
+                target += f"/{link_id}"
             elif (type(link_id) == list):
-                target += '?'
                 method = 'post'
 
+        params = []
         if (top):
-            target += f"%24top={top}"
-            argcount += 1
-        
+            params.append(f"%24top={top}")
+
         if (skip):
-            target += f"&%24skip={skip}"
-            argcount += 1
+            params.append(f"%24skip={skip}")
 
         # For crawling historical data
         if (date):
-            target += f"Dates={date}"
-            argcount += 1
-        
+            params.append(f"Dates={date}")
+
         # Required
-        if (argcount > 0):
-            target += f"&%24format={fileformat}"
-        else:
-            target += f"%24format={fileformat}"
+        params.append(f"%24format={fileformat}")
+        target += '?' + '&'.join(params)
+
+        def authorize(req: requests.PreparedRequest) -> requests.PreparedRequest:
+            # Called on every attempt so that retries pick up a refreshed token
+            req.headers['Authorization'] = f"Bearer {self.get_token(client_id, client_secret)}"
+            return req
+
+        def reauthorize() -> None:
+            self.token_manager.invalidate(self.auth_url, client_id)
 
         if (method == 'get'):
-            try:
-                api_key = f"Bearer {self.get_token(client_id, client_secret)}"
-                headers = {
-                    'Authorization': api_key
-                }
-                rtn = requests.get(url=f"{self.api_url}{target}", headers=headers)
-            except:
-                raise RuntimeError('There might be something wrong according to your input args. Check all your input args to ensure the API server return successfully.')
-        
+            rtn = self.session.request('get', f"{self.api_url}{target}",
+                                       on_unauthorized=reauthorize, auth=authorize, stream=stream)
         elif (method == 'post'):
-            try:
-                api_key = f"Bearer {self.get_token(client_id, client_secret)}"
-                headers = {
-                    'Authorization': api_key
-                }
-                rtn = requests.post(url=f"{self.api_url}{target}", headers=headers, json=link_id)
-            except:
-                raise RuntimeError('There might be something wrong according to your input args. Check all your input args to ensure the API server return successfully.')
-            
+            rtn = self.session.request('post', f"{self.api_url}{target}",
+                                       on_unauthorized=reauthorize, auth=authorize, json=link_id,
+                                       stream=stream)
+        else:
+            raise ValueError(f"'{method}' is not defined.")
+
         return rtn
 
+    def paginate(self,
+                 client_id: str,
+                 client_secret: str,
+                 target: str,
+                 page_size: int = 1000,
+                 prefetch: bool = False,
+                 records_key: str = None,
+                 **kwargs) -> Iterator[list]:
+        """ Walk a TDX collection with $top/$skip, yielding the parsed records page by page """
+        def fetch(skip: int) -> list:
+            rtn = self.response(client_id=client_id, client_secret=client_secret, target=target,
+                                fileformat='JSON', top=page_size, skip=skip, **kwargs)
+            return self._records(json.loads(rtn.content.decode('utf-8-sig')), records_key)
+
+        # At most two pages are held at once: the one being consumed and the one prefetched
+        executor = ThreadPoolExecutor(max_workers=1) if (prefetch) else None
+        try:
+            skip = 0
+            page = fetch(skip)
+            while True:
+                full = len(page) >= page_size
+                skip += page_size
+                following = executor.submit(fetch, skip) if (executor) and (full) else None
+                if (page):
+                    yield page
+                if (not full):
+                    break
+                page = following.result() if (following) else fetch(skip)
+        finally:
+            if (executor):
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _records(payload: any, records_key: str = None) -> list:
+        """ Pick the list of records out of a TDX payload, e.g. `VDs` or `VDLives` """
+        if (isinstance(payload, list)):
+            return payload
+        if (records_key):
+            return payload.get(records_key) or []
+        for value in payload.values():
+            if (isinstance(value, list)):
+                return value
+        return []
+
     def download(self, content: requests.models.Response,
                  filedir: str,
                  date: str,
                  filename: str,
-                 fileformat: str) -> None:
-        with open(f"{filedir}/{filename}{date}.{fileformat}", 'w') as f:
-            f.write(content.text)
-            f.close()
+                 fileformat: str,
+                 compression: str = None,
+                 chunk_size: int = 1 << 20,
+                 overwrite: bool = False) -> str:
+        """ Stream a response to disk atomically & return the written path
+
+        Pass `stream=True` to `response()` so the body is never held in memory.
+        A `.sha256` sidecar is written next to the file; files that already have a
+        matching sidecar are skipped unless `overwrite` is set.
+        """
+        path = self.download_path(filedir, date, filename, fileformat, compression)
+        if (not overwrite) and (self.is_downloaded(filedir, date, filename, fileformat, compression)):
+            content.close()
+            return path
+
+        fd, tmp_path = tempfile.mkstemp(dir=filedir, prefix=f".{os.path.basename(path)}.", suffix='.part')
+        try:
+            chmod_default(fd)
+            with os.fdopen(fd, 'wb') as f:
+                writer = _HashingWriter(f)
+                if (compression is None):
+                    sink = writer
+                elif (compression == 'gzip'):
+                    sink = gzip.GzipFile(filename='', mode='wb', fileobj=writer)
+                elif (compression == 'zstd'):
+                    if (zstandard is None):
+                        raise ImportError("Compression 'zstd' requires the 'zstandard' package.")
+                    sink = zstandard.ZstdCompressor().stream_writer(writer, closefd=False)
+                else:
+                    raise ValueError(f"'{compression}' is not defined.")
+
+                for chunk in content.iter_content(chunk_size=chunk_size):
+                    sink.write(chunk)
+                if (sink is not writer):
+                    sink.close()
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if (os.path.exists(tmp_path)):
+                os.remove(tmp_path)
+            raise
+        finally:
+            content.close()
+
+        # The sidecar is written last, so a crash never leaves an unverified file marked as done
+        with open(f"{tmp_path}.sha256", 'w') as f:
+            f.write(f"{writer.sha256.hexdigest()} {writer.size}\n")
+        os.replace(f"{tmp_path}.sha256", f"{path}.sha256")
+        return path
+
+    def download_path(self, filedir: str, date: str, filename: str, fileformat: str,
+                      compression: str = None) -> str:
+        return f"{filedir}/{filename}{date}.{fileformat}{COMPRESSION_SUFFIXES[compression]}"
+
+    def is_downloaded(self, filedir: str, date: str, filename: str, fileformat: str,
+                      compression: str = None, verify: bool = False) -> bool:
+        """ Whether the file exists and matches its sidecar (size, or full SHA-256 with `verify`) """
+        path = self.download_path(filedir, date, filename, fileformat, compression)
+        try:
+            with open(f"{path}.sha256") as f:
+                digest, size = f.read().split()
+            if (os.path.getsize(path) != int(size)):
+                return False
+        except (OSError, ValueError):
+            return False
+
+        if (verify):
+            sha256 = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    sha256.update(chunk)
+            return sha256.hexdigest() == digest
+        return True
+
+
+REGISTRY.register_cache('token', Crawler.token_manager.stats)
 
 
 class BasicDataCrawler(Crawler):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
         self.api_url = 'https://tdx.transportdata.tw/api/basic'
 
 
 class HistDataCrawler(Crawler):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
         self.api_url = 'https://tdx.transportdata.tw/api/historical'
 
 
 class RealTimeRoadInfoCrawler(BasicDataCrawler):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
         self.api_url += '/v2/Road/Traffic'
 
 
 class LinkInfoCrawler(BasicDataCrawler):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
         self.api_url += '/v2/Road/Link'
 
 
 class HistRoadInfoCrawler(HistDataCrawler):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
         self.api_url += '/v2/Historical/Road/Traffic'
 
 
-if __name__ == '__main__':
-    filedir = './trafficData'
-    dateStart = '2024-04-19'
-    dateEnd = '2024-04-19'
-    dateList = list(map(lambda x: datetime.strftime(x, '%Y-%m-%d'), pd.date_range(dateStart, dateEnd)))[::-1]
 
-    crawler = HistRoadInfoCrawler()
+class TokenBucket:
+    """ Asyncio token bucket allowing `rate` requests per second with bursts of `capacity`
+
+    One bucket may be shared by event loops running in different threads; they all draw
+    from the same tokens.
+    """
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # asyncio primitives are bound to one event loop, so each running loop gets its own
+        self._locks = weakref.WeakKeyDictionary()
+        # Guards the token count across those loops' threads; never held while awaiting
+        self._thread_lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._thread_lock:
+            lock = self._locks.get(loop)
+            if (lock is None):
+                lock = self._locks[loop] = asyncio.Lock()
+        async with lock:
+            while True:
+                with self._thread_lock:
+                    now = time.monotonic()
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if (self._tokens >= 1):
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                await asyncio.sleep(wait)
+
+
+class AsyncCrawler:
+    """ Asyncio counterpart of Crawler issuing many `response()` calls concurrently """
+    def __init__(self,
+                 crawler: Crawler,
+                 client_id: str,
+                 client_secret: str,
+                 concurrency: int = 8,
+                 rate: float = 5.0,
+                 burst: float = None) -> None:
+        # `rate` is in requests per second; the default follows the TDX per-key quota.
+        # Retries issued inside HTTPSession are not counted against the bucket.
+        self.crawler = crawler
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='tdx-crawler')
+        # One semaphore per event loop, e.g. per asyncio.run() of a polling loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    async def fetch(self, **request) -> requests.models.Response:
+        """ Await a single `Crawler.response(**request)` under the global limits """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if (semaphore is None):
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        async with semaphore:
+            await self.bucket.acquire()
+            return await loop.run_in_executor(
+                self._executor,
+                lambda: self.crawler.response(client_id=self.client_id,
+                                              client_secret=self.client_secret,
+                                              **request)
+            )
+
+    async def fetch_many(self, request_list: list, return_exceptions: bool = False):
+        """ Yield (request, response) pairs in completion order """
+        async def run(request: dict) -> tuple:
+            try:
+                return request, await self.fetch(**request)
+            except Exception as e:
+                if (not return_exceptions):
+                    raise
+                return request, e
+
+        tasks = [asyncio.ensure_future(run(dict(request))) for request in request_list]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> 'AsyncCrawler':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
 
-    # Dates: 'YYYY-mm-dd' or 'YYYY-mm-dd~YYYY-mm-dd' (At most 7 days)
-    for date in dateList:
-        print(f"============================ {date} ============================")
-        print('... VD 歷史資料 ...')
-        # VD 歷史資料
-        # City: Taipei / NewTaipei / Taoyuan / Taichung / Tainan / Kaohsiung / Keelung / YilanCounty / TaitungCounty
-        rtn = crawler.response(target='/VD', date=date, city='Taipei')
-        crawler.download(rtn, filedir, date, filename='臺北市車輛偵測器歷史資料')
-        
-        print('... VD 即時路況歷史資料 ...')
-        # VD 即時路況歷史資料
-        # City: Taipei / NewTaipei / Taoyuan / Taichung / Tainan / Kaohsiung / Keelung / YilanCounty / TaitungCounty
-        rtn = crawler.response(target='/Live/VD', date=date, city='Taipei')
-        crawler.download(rtn, filedir, date, filename='臺北市車輛偵測器即時路況歷史資料')
-
-        print('... 發佈路段歷史資料 ...')
-        # 發佈路段歷史資料
-        # City: Taipei / NewTaipei / Taoyuan / Taichung / Tainan / Keelung / ChanghuaCounty / YilanCounty
-        rtn = crawler.response(target='/Section', date=date, city='Taipei')
-        crawler.download(rtn, filedir, date, filename='臺北市發佈路段歷史資料')
-
-        print('... 發佈路段即時路況歷史資料 ...')
-        # 發佈路段即時路況歷史資料
-        # City: Taipei / NewTaipei / Taoyuan / Taichung / Tainan / Keelung / ChanghuaCounty / YilanCounty
-        rtn = crawler.response(target='/Live', date=date, city='Taipei')
-        crawler.download(rtn, filedir, date, filename='臺北市發佈路段即時路況歷史資料')
-
-        print('... 發佈路段之基礎路段組合歷史資料 ...')
-        # 發佈路段之基礎路段組合歷史資料
-        # City: Taipei / NewTaipei / Taoyuan / Taichung / Tainan / Keelung / ChanghuaCounty / YilanCounty
-        rtn = crawler.response(target='/SectionLink', date=date, city='Taipei')
-        crawler.download(rtn, filedir, date, filename='臺北市發佈路段之基礎路段組合歷史資料')
-        
-        print('... 發佈路段線型圖資歷史資料 ...')
-        # 發佈路段線型圖資歷史資料
-        # City: Taipei / NewTaipei / Taoyuan / Taichung / Tainan / Keelung / ChanghuaCounty / YilanCounty
-        rtn = crawler.response(target='/SectionShape', date=date, city='Taipei')
-        crawler.download(rtn, filedir, date, filename='臺北市發佈路段線型圖資歷史資料')
-        
-        print('... 路況壅塞水準歷史資料 ...')
-        # 路況壅塞水準歷史資料
-        # City: Taipei / NewTaipei / Taoyuan / Taichung / Tainan / Kaohsiung / Keelung / ChanghuaCounty / YunlinCounty / PingtungCounty / YilanCounty
-        rtn = crawler.response(target='/CongestionLevel', date=date, city='Taipei')
-        crawler.download(rtn, filedir, date, filename='臺北市路況壅塞水準歷史資料')
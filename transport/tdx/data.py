@@ -1,12 +1,260 @@
 import polars as pl
 import pandas as pd
+import io
+import os
+import re
+import glob
 import json
-from datetime import datetime
-from .crawler import HistRoadInfoCrawler, RealTimeRoadInfoCrawler, LinkInfoCrawler
+import multiprocessing
+from typing import Iterator
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from concurrent.futures import ProcessPoolExecutor
+from .crawler import HistRoadInfoCrawler, RealTimeRoadInfoCrawler, LinkInfoCrawler, open_compressed
+from .store import VDStore
+from .metrics import timed
+
+try:
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+except ImportError:
+    pa = None
 
 
 link_crawler = LinkInfoCrawler()
 
+# Nested layout of the TDX payloads; fields not listed here are skipped while decoding
+_DETECTION_LINK = pl.Struct({
+    'LinkID': pl.String,
+    'Bearing': pl.String,
+    'RoadDirection': pl.String,
+    'LaneNum': pl.Int64,
+    'ActualLaneNum': pl.Int64,
+})
+_VD = {
+    'VDID': pl.String,
+    'AuthorityCode': pl.String,
+    'BiDirectional': pl.Int64,
+    'DetectionLinks': pl.List(_DETECTION_LINK),
+    'VDType': pl.Int64,
+    'DetectionType': pl.Int64,
+    'PositionLon': pl.Float64,
+    'PositionLat': pl.Float64,
+    'CountyName': pl.String,
+    'TownName': pl.String,
+    'RoadID': pl.String,
+    'RoadName': pl.String,
+    'InfoTime': pl.String,
+    'UpdateTime': pl.String,
+}
+_VEHICLE = pl.Struct({
+    'VehicleType': pl.String,
+    'Volume': pl.Int64,
+    'Speed': pl.Float64,
+})
+_LANE = pl.Struct({
+    'LaneID': pl.Int64,
+    'LaneType': pl.Int64,
+    'Speed': pl.Float64,
+    'Occupancy': pl.Float64,
+    'Vehicles': pl.List(_VEHICLE),
+    'RecurrentTimes': pl.Int64,
+})
+_LINK_FLOW = pl.Struct({
+    'LinkID': pl.String,
+    'Lanes': pl.List(_LANE),
+})
+_VD_LIVE = {
+    'VDID': pl.String,
+    'AuthorityCode': pl.String,
+    'LinkFlows': pl.List(_LINK_FLOW),
+    'Status': pl.Int64,
+    'DataCollectTime': pl.String,
+    'InfoTime': pl.String,
+    'UpdateTime': pl.String,
+}
+_HEADER = {
+    'AuthorityCode': pl.String,
+    'SrcUpdateTime': pl.String,
+    'UpdateTime': pl.String,
+}
+
+VEHICLE_TYPES = {'M': 'Motor', 'S': 'SmallCar', 'L': 'LargeCar', 'T': 'TruckCar'}
+
+# Output dtypes: repeated IDs & names are categoricals, counters narrow ints, measurements
+# Float32 and timestamps timezone-aware. Coordinates stay Float64 (Float32 is ~1m off).
+TIMEZONE = 'Asia/Taipei'
+_TIME = pl.Datetime('ms', TIMEZONE)
+VD_STATIC_SCHEMA = {
+    'VDID': pl.Categorical,
+    'AutorityCode': pl.Categorical,
+    'BiDirectional': pl.Int8,
+    'DetectionLinkID': pl.Categorical,
+    'Bearing': pl.Categorical,
+    'RoadDirection': pl.Categorical,
+    'LaneNum': pl.Int8,
+    'ActualLaneNum': pl.Int8,
+    'VDType': pl.Int8,
+    'DetectionType': pl.Int8,
+    'PositionLon': pl.Float64,
+    'PositionLat': pl.Float64,
+    'CountyName': pl.Categorical,
+    'TownName': pl.Categorical,
+    'RoadID': pl.Categorical,
+    'RoadName': pl.Categorical,
+    'InfoTime': _TIME,
+    'UpdateTime': _TIME,
+}
+VD_LANES_SCHEMA = {
+    'VDID': pl.Categorical,
+    'AutorityCode': pl.Categorical,
+    'LinkID': pl.Categorical,
+    'LaneID': pl.Int8,
+    'LaneType': pl.Int8,
+    'Speed': pl.Float32,
+    'Occupancy': pl.Float32,
+    'VehicleType': pl.Categorical,
+    'Volume': pl.Int16,
+    'VehicleSpeed': pl.Float32,
+    'RecurrentTimes': pl.Int16,
+    'Status': pl.Int8,
+    'DataCollectTime': _TIME,
+    'InfoTime': _TIME,
+    'UpdateTime': _TIME,
+}
+VD_DYNAMIC_SCHEMA = {
+    'VDID': pl.Categorical,
+    'AutorityCode': pl.Categorical,
+    'LinkID': pl.Categorical,
+    'LaneID': pl.Int8,
+    'LaneType': pl.Int8,
+    'Speed': pl.Float32,
+    'Occupancy': pl.Float32,
+    **{f"{name}{field}": dtype for name in VEHICLE_TYPES.values()
+       for field, dtype in (('Volume', pl.Int16), ('Speed', pl.Float32))},
+    'RecurrentTimes': pl.Int16,
+    'RecurrentZeroTimes': pl.Int16,
+    'Status': pl.Int8,
+    'DataCollectTime': _TIME,
+    'InfoTime': _TIME,
+    'UpdateTime': _TIME,
+}
+
+# Section datasets; AuthorityCode / InfoTime / UpdateTime fall back to the document header
+_RECORD_META = {
+    'AuthorityCode': pl.String,
+    'InfoTime': pl.String,
+    'UpdateTime': pl.String,
+}
+_SECTION = {
+    'SectionID': pl.String,
+    'SectionName': pl.String,
+    'RoadID': pl.String,
+    'RoadName': pl.String,
+    'RoadClass': pl.Int64,
+    'RoadDirection': pl.String,
+    'RoadSection': pl.Struct({'Start': pl.String, 'End': pl.String}),
+    'SectionLength': pl.Float64,
+    'SectionMile': pl.Struct({'StartKM': pl.String, 'EndKM': pl.String}),
+    'SpeedLimit': pl.Float64,
+    **_RECORD_META,
+}
+_SECTION_LIVE = {
+    'SectionID': pl.String,
+    'TravelTime': pl.Float64,
+    'TravelSpeed': pl.Float64,
+    'CongestionLevelID': pl.String,
+    'CongestionLevel': pl.String,
+    'HasHistorical': pl.Int64,
+    'HasVD': pl.Int64,
+    'HasAVI': pl.Int64,
+    'HasETAG': pl.Int64,
+    'HasGVP': pl.Int64,
+    'HasCVP': pl.Int64,
+    'HasOthers': pl.Int64,
+    'DataCollectTime': pl.String,
+    **_RECORD_META,
+}
+_SECTION_LINK = {
+    'SectionID': pl.String,
+    'LinkIDs': pl.List(pl.Struct({'LinkID': pl.String})),
+    **_RECORD_META,
+}
+_SECTION_SHAPE = {
+    'SectionID': pl.String,
+    'Geometry': pl.String,
+    **_RECORD_META,
+}
+_CONGESTION_LEVEL = {
+    'CongestionLevelID': pl.String,
+    'CongestionLevelName': pl.String,
+    'Levels': pl.List(pl.Struct({
+        'Level': pl.String,
+        'LevelName': pl.String,
+        'TopValue': pl.Float64,
+        'LowValue': pl.Float64,
+    })),
+    **_RECORD_META,
+}
+
+_META_SCHEMA = {
+    'AuthorityCode': pl.Categorical,
+    'InfoTime': _TIME,
+    'UpdateTime': _TIME,
+}
+SECTION_SCHEMA = {
+    'SectionID': pl.Categorical,
+    'SectionName': pl.Categorical,
+    'RoadID': pl.Categorical,
+    'RoadName': pl.Categorical,
+    'RoadClass': pl.Int8,
+    'RoadDirection': pl.Categorical,
+    'SectionStart': pl.Categorical,
+    'SectionEnd': pl.Categorical,
+    'SectionLength': pl.Float32,
+    'StartKM': pl.String,
+    'EndKM': pl.String,
+    'SpeedLimit': pl.Float32,
+    **_META_SCHEMA,
+}
+SECTION_LIVE_SCHEMA = {
+    'SectionID': pl.Categorical,
+    'TravelTime': pl.Float32,
+    'TravelSpeed': pl.Float32,
+    'CongestionLevelID': pl.Categorical,
+    'CongestionLevel': pl.Categorical,
+    **{f"Has{source}": pl.Int8 for source in ('Historical', 'VD', 'AVI', 'ETAG', 'GVP', 'CVP', 'Others')},
+    'DataCollectTime': _TIME,
+    **_META_SCHEMA,
+}
+SECTION_LINK_SCHEMA = {
+    'SectionID': pl.Categorical,
+    'LinkOrder': pl.UInt16,
+    'LinkID': pl.Categorical,
+    **_META_SCHEMA,
+}
+SECTION_SHAPE_SCHEMA = {
+    'SectionID': pl.Categorical,
+    'Part': pl.UInt16,
+    'Lon': pl.List(pl.Float64),
+    'Lat': pl.List(pl.Float64),
+    **_META_SCHEMA,
+}
+CONGESTION_LEVEL_SCHEMA = {
+    'CongestionLevelID': pl.Categorical,
+    'CongestionLevelName': pl.Categorical,
+    'Level': pl.Categorical,
+    'LevelName': pl.Categorical,
+    'LowValue': pl.Float32,
+    'TopValue': pl.Float32,
+    **_META_SCHEMA,
+}
+
+def _parser(fn: callable) -> callable:
+    """ Time a get* parser & count the rows it returns, when metrics are enabled """
+    return timed('tdx_parse', labels={'parser': fn.__name__}, records=len)(fn)
+
+@_parser
 def getLinkInfo(contents: list, df_type: str = 'polars') -> any:
     # linkInfo = link_crawler.response(target='/LinkID', link_id=link_id, fileformat='JSON')
     if (df_type == 'polars'):
@@ -21,144 +269,720 @@ def getLinkInfo(contents: list, df_type: str = 'polars') -> any:
     else:
         raise ValueError(f"'{df_type}' is not defined.")
 
-def getVDStatic(contents: list, date: str, df_type: str = 'polars') -> any:
-    """ Get VD Static Data from TDX (daily updated) """
-    vdStacInfo = []
+def _isHistorical(date: str) -> bool:
+    return (date is not None) and (datetime.strptime(date, '%Y-%m-%d').date() < datetime.now().date())
+
+def _tdxTime(col: str) -> pl.Expr:
+    """ '2024-04-19T10:00:00+08:00' -> 2024-04-19 10:00:00 (Asia/Taipei) """
+    return pl.col(col).str.to_datetime('%Y-%m-%dT%H:%M:%S%z', time_unit='ms').dt.convert_time_zone(TIMEZONE)
+
+def _stripBOM(content: str) -> str:
+    return content[1:] if (content.startswith('\ufeff')) else content
+
+def _arrowType(dtype: 'pa.DataType') -> 'pa.DataType':
+    """ The pyarrow JSON reader only fills plain string & list types """
+    if (pa.types.is_large_string(dtype)) or (pa.types.is_string_view(dtype)):
+        return pa.string()
+    if (pa.types.is_large_list(dtype)) or (pa.types.is_list(dtype)):
+        return pa.list_(_arrowType(dtype.value_type))
+    if (pa.types.is_struct(dtype)):
+        return pa.struct([pa.field(f.name, _arrowType(f.type)) for f in dtype])
+    return dtype
+
+def _readRecords(contents: list, schema: dict) -> pl.DataFrame:
+    """ Decode historical contents, one record per content
+
+    With pyarrow installed the contents are read as NDJSON by its (multi-threaded)
+    reader, about twice as fast as pl.read_json; records it rejects, e.g. values
+    not matching the schema, fall back to pl.read_json.
+    """
+    if (pa) and (contents):
+        arrowSchema = pa.schema([pa.field(f.name, _arrowType(f.type))
+                                 for f in pl.DataFrame(schema=schema).to_arrow().schema])
+        try:
+            table = pa_json.read_json(
+                io.BytesIO('\n'.join(_stripBOM(content) for content in contents).encode()),
+                read_options=pa_json.ReadOptions(block_size=1 << 24),
+                parse_options=pa_json.ParseOptions(explicit_schema=arrowSchema, newlines_in_values=True,
+                                                   unexpected_field_behavior='ignore'),
+            )
+            return pl.from_arrow(table).cast(schema)
+        except pa.ArrowInvalid:
+            pass
+    array = '[' + ','.join(_stripBOM(content) for content in contents) + ']'
+    return pl.read_json(io.BytesIO(array.encode()), schema=schema)
+
+def _readDocuments(contents: list, schema: dict, key: str) -> pl.DataFrame:
+    """ Decode real-time documents into one record per item of their `key` list """
+    frames = []
     for content in contents:
-        if (content.startswith('\ufeff')):
-            content = content[1:]
-        content = json.loads(content)
-        if (datetime.strptime(date, '%Y-%m-%d').date() < datetime.now().date()):
-            data = {}
-            data['VDID'] = content['VDID']
-            data['AutorityCode'] = content['AuthorityCode']
-            data['BiDirectional'] = content['BiDirectional']
-            for item in content['DetectionLinks']:
-                data['DetectionLinkID'] = item['LinkID']
-                data['Bearing'] = item['Bearing']
-                data['RoadDirection'] = item['RoadDirection']
-                data['LaneNum'] = item['LaneNum']
-                data['ActualLaneNum'] = item['ActualLaneNum']
-            data['VDType'] = content['VDType']
-            data['DetectionType'] = content['DetectionType']
-            data['PositionLon'] = content['PositionLon']
-            data['PositionLat'] = content['PositionLat']
-            data['CountyName'] = content['CountyName']
-            data['TownName'] = content['TownName']
-            data['RoadID'] = content['RoadID']
-            data['RoadName'] = content['RoadName']
-            data['InfoTime'] = content['InfoTime'].replace('T',' ')[:-6]
-            data['UpdateTime'] = content['UpdateTime'].replace('T',' ')[:-6]
-            vdStacInfo.append(data)
+        doc = pl.read_json(io.BytesIO(_stripBOM(content).encode()),
+                           schema={**_HEADER, key: pl.List(pl.Struct(schema))})
+        items = doc[key][0]
+        records = items.struct.unnest() if (items is not None) else pl.DataFrame(schema=schema)
+        frames.append(records.with_columns(
+            pl.lit(doc['AuthorityCode'][0], dtype=pl.String).alias('HeaderAuthorityCode'),
+            pl.lit(doc['SrcUpdateTime'][0], dtype=pl.String).alias('HeaderSrcUpdateTime'),
+            pl.lit(doc['UpdateTime'][0], dtype=pl.String).alias('HeaderUpdateTime'),
+        ))
+    if (not frames):
+        return pl.DataFrame(schema={**schema, **{f"Header{k}": v for k, v in _HEADER.items()}})
+    return pl.concat(frames)
+
+def _nested(col: str, path: list, field: str) -> pl.Expr:
+    """ Pull `field` out of the list-of-struct levels `path` below `col`, keeping the nesting
+
+    e.g. _nested('LinkFlows', ['Lanes'], 'Speed') is list[list[f64]]. Exploding such
+    primitive lists is far cheaper than exploding the nested structs themselves.
+    """
+    expr = pl.element().struct.field(field)
+    for level in reversed(path):
+        expr = pl.element().struct.field(level).list.eval(expr)
+    return pl.col(col).list.eval(expr).alias(field)
+
+def _explodeNested(df: pl.DataFrame, cols: list, depth: int, index: str = None) -> pl.DataFrame:
+    """ Explode `depth` list levels of `cols`, dropping empty lists on the way
+
+    With `index`, the position of each element within its (last exploded) list is kept
+    in that column.
+    """
+    for level in range(depth):
+        df = df.filter(pl.col(cols[0]).list.len() > 0)
+        if (index) and (level == depth - 1):
+            df = df.with_columns(pl.int_ranges(0, pl.col(cols[0]).list.len(), dtype=pl.UInt32).alias(index))
+            df = df.explode([*cols, index])
+        else:
+            df = df.explode(cols)
+    return df
+
+# Integer columns become nullable pandas ints instead of float64 (nulls) or int64
+_PANDAS_INTS = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.uint8(): pd.UInt8Dtype(),
+    pa.uint16(): pd.UInt16Dtype(),
+    pa.uint32(): pd.UInt32Dtype(),
+    pa.uint64(): pd.UInt64Dtype(),
+} if (pa) else {}
+
+def _toPandas(df: pl.DataFrame) -> pd.DataFrame:
+    """ Convert keeping the compact dtypes (nullable ints, float32, category, tz-aware)
+
+    Goes through Arrow when pyarrow is installed; the fallback builds the columns
+    from Python objects & is several times slower.
+    """
+    if (pa):
+        return df.to_arrow().to_pandas(types_mapper=_PANDAS_INTS.get)
+    columns = {}
+    for name, s in df.to_dict().items():
+        if (s.dtype == pl.Categorical):
+            columns[name] = pd.Categorical(s.to_list())
+        elif (s.dtype.is_integer()):
+            columns[name] = pd.array(s.to_list(), dtype=str(s.dtype))
+        elif (s.dtype.is_float()):
+            columns[name] = s.to_numpy()
+        elif (isinstance(s.dtype, pl.Datetime)):
+            values = pd.to_datetime(s.dt.epoch('ms').to_numpy(), unit='ms', utc=True)
+            columns[name] = values.tz_convert(s.dtype.time_zone) if (s.dtype.time_zone) else values.tz_localize(None)
         else:
-            for vdInfo in content['VDs']:
-                data = {}
-                data['VDID'] = vdInfo['VDID']
-                data['AutorityCode'] = content['AuthorityCode']
-                data['BiDirectional'] = vdInfo['BiDirectional']
-                for item in vdInfo['DetectionLinks']:
-                    data['DetectionLinkID'] = item['LinkID']
-                    data['Bearing'] = item['Bearing']
-                    data['RoadDirection'] = item['RoadDirection']
-                    data['LaneNum'] = item['LaneNum']
-                    data['ActualLaneNum'] = item['ActualLaneNum']
-                data['VDType'] = vdInfo['VDType']
-                data['DetectionType'] = vdInfo['DetectionType']
-                data['PositionLon'] = vdInfo['PositionLon']
-                data['PositionLat'] = vdInfo['PositionLat']
-                data['CountyName'] = None
-                data['TownName'] = None
-                data['RoadID'] = vdInfo['RoadID']
-                data['RoadName'] = vdInfo['RoadName']
-                data['InfoTime'] = content['SrcUpdateTime'].replace('T',' ')[:-6]
-                data['UpdateTime'] = content['UpdateTime'].replace('T',' ')[:-6]
-                vdStacInfo.append(data)
+            columns[name] = s.to_list()
+    return pd.DataFrame(columns, index=pd.RangeIndex(df.height))
 
+def _output(df: pl.DataFrame, df_type: str) -> any:
     if (df_type == 'polars'):
-        return pl.DataFrame(vdStacInfo)
+        return df
     elif (df_type == 'pandas'):
-        return pd.DataFrame(vdStacInfo)
+        return _toPandas(df)
     elif (df_type == 'dict'):
-        return vdStacInfo
+        return df.to_dicts()
     else:
         raise ValueError(f"'{df_type}' is not defined.")
+
+def _flattenVDStatic(records: pl.DataFrame, historical: bool) -> pl.DataFrame:
+    """ One row per VD; only the last DetectionLink is kept """
+    if (historical):
+        header = [
+            pl.col('AuthorityCode').alias('AutorityCode'),
+            pl.col('CountyName'),
+            pl.col('TownName'),
+            _tdxTime('InfoTime').alias('InfoTime'),
+            _tdxTime('UpdateTime').alias('UpdateTime'),
+        ]
+    else:
+        header = [
+            pl.col('HeaderAuthorityCode').alias('AutorityCode'),
+            pl.lit(None, dtype=pl.String).alias('CountyName'),
+            pl.lit(None, dtype=pl.String).alias('TownName'),
+            _tdxTime('HeaderSrcUpdateTime').alias('InfoTime'),
+            _tdxTime('HeaderUpdateTime').alias('UpdateTime'),
+        ]
+
+    link = pl.col('DetectionLinks').list.last().struct
+    return records.select(
+        'VDID',
+        *header,
+        'BiDirectional',
+        link.field('LinkID').alias('DetectionLinkID'),
+        link.field('Bearing'),
+        link.field('RoadDirection'),
+        link.field('LaneNum'),
+        link.field('ActualLaneNum'),
+        'VDType',
+        'DetectionType',
+        'PositionLon',
+        'PositionLat',
+        'RoadID',
+        'RoadName',
+    ).select(
+        'VDID', 'AutorityCode', 'BiDirectional', 'DetectionLinkID', 'Bearing', 'RoadDirection',
+        'LaneNum', 'ActualLaneNum', 'VDType', 'DetectionType', 'PositionLon', 'PositionLat',
+        'CountyName', 'TownName', 'RoadID', 'RoadName', 'InfoTime', 'UpdateTime'
+    ).cast(VD_STATIC_SCHEMA)
+
+def _flattenVDLanes(records: pl.DataFrame, historical: bool) -> pl.DataFrame:
+    """ One row per VDID/LinkID/LaneID/VehicleType, in payload order
+
+    Links without lanes and lanes without vehicles are kept as rows with nulls, so
+    that pivotVDLanes can reproduce the wide per-VD layout exactly.
+    """
+    laneFields = ['LaneID', 'LaneType', 'Speed', 'Occupancy', 'RecurrentTimes']
+    vehicleFields = ['VehicleType', 'Volume', 'Speed']
+    laneCols = [f"Lane{f}" for f in laneFields]
+    vehicleCols = [f"Vehicle{f}" for f in vehicleFields]
+    records = records.with_row_index('_row')
+
+    # Exploding in place keeps payload order & turns empty lists into null rows, so no
+    # joins or sort are needed to put the levels back together
+    vehicles = (
+        records.select(
+            '_row',
+            _nested('LinkFlows', [], 'LinkID'),
+            *[_nested('LinkFlows', ['Lanes'], f).alias(c) for f, c in zip(laneFields, laneCols)],
+            *[_nested('LinkFlows', ['Lanes', 'Vehicles'], f).alias(c) for f, c in zip(vehicleFields, vehicleCols)],
+        )
+        .explode(['LinkID', *laneCols, *vehicleCols], empty_as_null=True)
+        .explode([*laneCols, *vehicleCols], empty_as_null=True)
+        .explode(vehicleCols, empty_as_null=True)
+    )
+
+    if (historical):
+        header = records.select(
+            'VDID',
+            pl.col('AuthorityCode').alias('AutorityCode'),
+            'Status',
+            _tdxTime('DataCollectTime').alias('DataCollectTime'),
+            _tdxTime('InfoTime').alias('InfoTime'),
+            _tdxTime('UpdateTime').alias('UpdateTime'),
+        )
+        recurrentTimes = pl.col('LaneRecurrentTimes')
+    else:
+        header = records.select(
+            'VDID',
+            pl.col('HeaderAuthorityCode').alias('AutorityCode'),
+            'Status',
+            _tdxTime('DataCollectTime').alias('DataCollectTime'),
+            _tdxTime('HeaderUpdateTime').alias('InfoTime'),
+            _tdxTime('HeaderUpdateTime').alias('UpdateTime'),
+        )
+        recurrentTimes = pl.lit(None, dtype=pl.Int64)
+
+    return (
+        pl.concat([vehicles, header[vehicles['_row']]], how='horizontal')
+        .select(
+            '_row',
+            'VDID',
+            'AutorityCode',
+            'LinkID',
+            pl.col('LaneLaneID').alias('LaneID'),
+            pl.col('LaneLaneType').alias('LaneType'),
+            pl.col('LaneSpeed').alias('Speed'),
+            pl.col('LaneOccupancy').alias('Occupancy'),
+            pl.col('VehicleVehicleType').alias('VehicleType'),
+            pl.col('VehicleVolume').alias('Volume'),
+            pl.col('VehicleSpeed'),
+            recurrentTimes.alias('RecurrentTimes'),
+            'Status',
+            'DataCollectTime',
+            'InfoTime',
+            'UpdateTime',
+        )
+        .cast(VD_LANES_SCHEMA)
+    )
+
+def _readVDLives(contents: list, date: str) -> pl.DataFrame:
+    historical = _isHistorical(date)
+    if (historical):
+        records = _readRecords(contents, _VD_LIVE)
+    else:
+        records = _readDocuments(contents, _VD_LIVE, 'VDLives')
+    return _flattenVDLanes(records, historical)
+
+def _pivotVDLanes(lanes: pl.DataFrame, keys: list) -> pl.DataFrame:
+    hasLane = pl.col('LaneID').is_not_null()
+    recordFields = [c for c in ('VDID', 'AutorityCode', 'Status', 'DataCollectTime', 'InfoTime', 'UpdateTime')
+                    if (c not in keys)]
+    wide = lanes.group_by(keys, maintain_order=True).agg(
+        pl.col(recordFields).first(),
+        pl.col('LinkID').last(),
+        pl.col('LaneID', 'LaneType', 'Speed', 'Occupancy', 'RecurrentTimes').filter(hasLane).last(),
+        *[
+            pl.col(src).filter(pl.col('VehicleType') == vtype).last().alias(f"{name}{field}")
+            for vtype, name in VEHICLE_TYPES.items()
+            for src, field in (('Volume', 'Volume'), ('VehicleSpeed', 'Speed'))
+        ],
+    )
+    return wide.select(
+        'VDID', 'AutorityCode', 'LinkID', 'LaneID', 'LaneType', 'Speed', 'Occupancy',
+        *[f"{name}{field}" for name in VEHICLE_TYPES.values() for field in ('Volume', 'Speed')],
+        'RecurrentTimes',
+        # Kept as-is for compatibility: the zero count was always filled from RecurrentTimes
+        pl.col('RecurrentTimes').alias('RecurrentZeroTimes'),
+        'Status', 'DataCollectTime', 'InfoTime', 'UpdateTime'
+    ).cast(VD_DYNAMIC_SCHEMA)
+
+def pivotVDLanes(lanes: pl.DataFrame, df_type: str = 'polars') -> any:
+    """ Lane-level VD data (getVDLanes) -> one row per VD & DataCollectTime as in getVDDynamic
+
+    For each VD the last link & lane are kept, and per vehicle type the last value seen.
+    """
+    return _output(_pivotVDLanes(lanes, ['VDID', 'DataCollectTime']), df_type)
+
+@_parser
+def getVDStatic(contents: list, date: str, df_type: str = 'polars') -> any:
+    """ Get VD Static Data from TDX (daily updated) """
+    historical = _isHistorical(date)
+    if (historical):
+        records = _readRecords(contents, _VD)
+    else:
+        records = _readDocuments(contents, _VD, 'VDs')
+    return _output(_flattenVDStatic(records, historical), df_type)
     
+@_parser
 def getVDDynamic(contents: list, date: str = None, df_type: str = 'polars') -> any:
     """ Get VD Dynamic Data from TDX (updated per minute) """
-    vdDymcInfo = []
-    for content in contents:
-        if (content.startswith('\ufeff')):
-            content = content[1:]
-        content = json.loads(content)
-        if (date) and (datetime.strptime(date, '%Y-%m-%d').date() < datetime.now().date()):
-            data = {}
-            data['VDID'] = content['VDID']
-            data['AutorityCode'] = content['AuthorityCode']
-            for item in content['LinkFlows']:
-                data['LinkID'] = item['LinkID']
-                for lane in item['Lanes']:
-                    data['LaneID'] = lane['LaneID']
-                    data['LaneType'] = lane['LaneType']
-                    data['Speed'] = lane['Speed']
-                    data['Occupancy'] = lane['Occupancy']
-                    for veh in lane['Vehicles']:
-                        if (veh['VehicleType'] == 'M'):
-                            data['MotorVolume'] = veh['Volume']
-                            data['MotorSpeed'] = veh['Speed']
-                        elif (veh['VehicleType'] == 'S'):
-                            data['SmallCarVolume'] = veh['Volume']
-                            data['SmallCarSpeed'] = veh['Speed']
-                        elif (veh['VehicleType'] == 'L'):
-                            data['LargeCarVolume'] = veh['Volume']
-                            data['LargeCarSpeed'] = veh['Speed']
-                        elif (veh['VehicleType'] == 'T'):
-                            data['TruckCarVolume'] = veh['Volume']
-                            data['TruckCarSpeed'] = veh['Speed']
-                    data['RecurrentTimes'] = lane['RecurrentTimes']
-                    data['RecurrentZeroTimes'] = lane['RecurrentTimes']        
-            data['Status'] = content['Status']
-            data['DataCollectTime'] = content['DataCollectTime'].replace('T',' ')[:-6]
-            data['InfoTime'] = content['InfoTime'].replace('T',' ')[:-6]
-            data['UpdateTime'] = content['UpdateTime'].replace('T',' ')[:-6]
-            vdDymcInfo.append(data)
-        else:
-            for vdInfo in content['VDLives']:
-                data = {}
-                data['VDID'] = vdInfo['VDID']
-                data['AutorityCode'] = content['AuthorityCode']
-                for item in vdInfo['LinkFlows']:
-                    data['LinkID'] = item['LinkID']
-                    for lane in item['Lanes']:
-                        data['LaneID'] = lane['LaneID']
-                        data['LaneType'] = lane['LaneType']
-                        data['Speed'] = lane['Speed']
-                        data['Occupancy'] = lane['Occupancy']
-                        for veh in lane['Vehicles']:
-                            if (veh['VehicleType'] == 'M'):
-                                data['MotorVolume'] = veh['Volume']
-                                data['MotorSpeed'] = veh['Speed']
-                            elif (veh['VehicleType'] == 'S'):
-                                data['SmallCarVolume'] = veh['Volume']
-                                data['SmallCarSpeed'] = veh['Speed']
-                            elif (veh['VehicleType'] == 'L'):
-                                data['LargeCarVolume'] = veh['Volume']
-                                data['LargeCarSpeed'] = veh['Speed']
-                            elif (veh['VehicleType'] == 'T'):
-                                data['TruckCarVolume'] = veh['Volume']
-                                data['TruckCarSpeed'] = veh['Speed']
-                        data['RecurrentTimes'] = None
-                        data['RecurrentZeroTimes'] = None
-                data['Status'] = vdInfo['Status']
-                data['DataCollectTime'] = vdInfo['DataCollectTime'].replace('T',' ')[:-6]
-                data['InfoTime'] = content['UpdateTime'].replace('T',' ')[:-6]
-                data['UpdateTime'] = content['UpdateTime'].replace('T',' ')[:-6]
-                vdDymcInfo.append(data)
+    return _output(_pivotVDLanes(_readVDLives(contents, date), ['_row']), df_type)
 
-    if (df_type == 'polars'):
-        return pl.DataFrame(vdDymcInfo)
-    elif (df_type == 'pandas'):
-        return pd.DataFrame(vdDymcInfo)
-    elif (df_type == 'dict'):
-        return vdDymcInfo
+@_parser
+def getVDLanes(contents: list, date: str = None, df_type: str = 'polars') -> any:
+    """ Get lane-level VD Dynamic Data, one row per VDID/LinkID/LaneID/VehicleType """
+    return _output(_readVDLives(contents, date).drop('_row'), df_type)
+
+def _readSectionRecords(contents: list, date: str, schema: dict, key: str) -> pl.DataFrame:
+    """ Records of a Section dataset, with AuthorityCode / InfoTime / UpdateTime filled in """
+    if (_isHistorical(date)):
+        records = _readRecords(contents, schema)
     else:
-        raise ValueError(f"'{df_type}' is not defined.")
+        records = _readDocuments(contents, schema, key).with_columns(
+            pl.coalesce('AuthorityCode', 'HeaderAuthorityCode').alias('AuthorityCode'),
+            pl.coalesce('InfoTime', 'HeaderSrcUpdateTime').alias('InfoTime'),
+            pl.coalesce('UpdateTime', 'HeaderUpdateTime').alias('UpdateTime'),
+        ).drop([f"Header{k}" for k in _HEADER])
+    return records.with_columns(_tdxTime('InfoTime'), _tdxTime('UpdateTime'))
+
+@_parser
+def getSection(contents: list, date: str, df_type: str = 'polars') -> any:
+    """ Get Section (發佈路段) Static Data from TDX, one row per SectionID """
+    records = _readSectionRecords(contents, date, _SECTION, 'Sections')
+    return _output(records.select(
+        'SectionID', 'SectionName', 'RoadID', 'RoadName', 'RoadClass', 'RoadDirection',
+        pl.col('RoadSection').struct.field('Start').alias('SectionStart'),
+        pl.col('RoadSection').struct.field('End').alias('SectionEnd'),
+        'SectionLength',
+        pl.col('SectionMile').struct.field('StartKM'),
+        pl.col('SectionMile').struct.field('EndKM'),
+        'SpeedLimit', 'AuthorityCode', 'InfoTime', 'UpdateTime'
+    ).cast(SECTION_SCHEMA), df_type)
+
+@_parser
+def getSectionLive(contents: list, date: str = None, df_type: str = 'polars') -> any:
+    """ Get Section Live Traffic (發佈路段即時路況) from TDX (updated per minute) """
+    records = _readSectionRecords(contents, date, _SECTION_LIVE, 'LiveTraffics')
+    return _output(
+        records.with_columns(_tdxTime('DataCollectTime')).select(list(SECTION_LIVE_SCHEMA)).cast(SECTION_LIVE_SCHEMA),
+        df_type
+    )
+
+@_parser
+def getSectionLink(contents: list, date: str, df_type: str = 'polars') -> any:
+    """ Get the Links of each Section from TDX, one row per SectionID & LinkID in Section order """
+    records = _readSectionRecords(contents, date, _SECTION_LINK, 'SectionLinks')
+    links = _explodeNested(
+        records.select('SectionID', _nested('LinkIDs', [], 'LinkID'), 'AuthorityCode', 'InfoTime', 'UpdateTime'),
+        ['LinkID'], depth=1, index='LinkOrder'
+    )
+    return _output(links.select(list(SECTION_LINK_SCHEMA)).cast(SECTION_LINK_SCHEMA), df_type)
+
+@_parser
+def getSectionShape(contents: list, date: str, df_type: str = 'polars') -> any:
+    """ Get Section geometry from TDX as coordinate arrays, one row per line of each Section
+
+    WKT 'LINESTRING(lon lat, ...)' becomes a row with Part 0 and Lon / Lat lists; each line
+    of a MULTILINESTRING gets its own Part. Sections without coordinates have no rows.
+    """
+    records = _readSectionRecords(contents, date, _SECTION_SHAPE, 'SectionShapes')
+    parts = records.with_columns(
+        # 'MULTILINESTRING((a b, c d),(e f, g h))' -> ['a b, c d', ',e f, g h', ...]
+        pl.col('Geometry').str.replace(r'^[^(]*', '').str.replace_all('(', '', literal=True).str.split(')')
+        .list.eval(pl.element().filter(pl.element().str.strip_chars(' ,').str.len_bytes() > 0))
+    )
+    parts = _explodeNested(parts, ['Geometry'], depth=1, index='Part')
+    numbers = (
+        pl.col('Geometry').str.replace_all(',', ' ', literal=True).str.split(' ')
+        .list.eval(pl.element().filter(pl.element().str.len_bytes() > 0).cast(pl.Float64))
+    )
+    shapes = parts.with_columns(numbers).select(
+        'SectionID',
+        'Part',
+        pl.col('Geometry').list.gather_every(2).alias('Lon'),
+        pl.col('Geometry').list.gather_every(2, offset=1).alias('Lat'),
+        'AuthorityCode', 'InfoTime', 'UpdateTime'
+    )
+    return _output(shapes.cast(SECTION_SHAPE_SCHEMA), df_type)
+
+@_parser
+def getCongestionLevel(contents: list, date: str, df_type: str = 'polars') -> any:
+    """ Get Congestion Level definitions from TDX, one row per CongestionLevelID & Level """
+    records = _readSectionRecords(contents, date, _CONGESTION_LEVEL, 'CongestionLevels')
+    levelFields = ['Level', 'LevelName', 'LowValue', 'TopValue']
+    levels = _explodeNested(
+        records.select('CongestionLevelID', 'CongestionLevelName',
+                       *[_nested('Levels', [], f) for f in levelFields], 'AuthorityCode', 'InfoTime', 'UpdateTime'),
+        levelFields, depth=1
+    )
+    return _output(levels.select(list(CONGESTION_LEVEL_SCHEMA)).cast(CONGESTION_LEVEL_SCHEMA), df_type)
+
+def indexSectionVDs(sectionLinks: pl.DataFrame, vdStatic: pl.DataFrame, df_type: str = 'polars') -> any:
+    """ Section <-> Link <-> VD index from getSectionLink & getVDStatic output
+
+    One row per (SectionID, LinkID, VDID) for the VDs detecting a Link of the Section,
+    so per-Section figures from VD data are plain joins (see getSectionSpeed).
+    """
+    links = sectionLinks.select(
+        pl.col('SectionID').cast(pl.Categorical),
+        pl.col('LinkID').cast(pl.Categorical),
+    ).unique(maintain_order=True)
+    vds = vdStatic.select(
+        pl.col('DetectionLinkID').cast(pl.Categorical).alias('LinkID'),
+        pl.col('VDID').cast(pl.Categorical),
+    ).filter(pl.col('LinkID').is_not_null()).unique(maintain_order=True)
+    return _output(links.join(vds, on='LinkID', how='inner', maintain_order='left'), df_type)
+
+@_parser
+def getSectionSpeed(vdDynamic: pl.DataFrame, index: pl.DataFrame, df_type: str = 'polars') -> any:
+    """ Volume-weighted speed of each Section from getVDDynamic output & indexSectionVDs
+
+    Vehicle types with a negative (error) volume or speed are left out. TravelSpeed is
+    null for Sections whose VDs saw no valid traffic.
+    """
+    weighted, volume = [], []
+    for name in VEHICLE_TYPES.values():
+        valid = (pl.col(f"{name}Volume") > 0) & (pl.col(f"{name}Speed") >= 0)
+        v = pl.when(valid).then(pl.col(f"{name}Volume").cast(pl.Float64)).otherwise(0.0)
+        volume.append(v)
+        weighted.append(v * pl.col(f"{name}Speed").cast(pl.Float64))
+    perVD = vdDynamic.select(
+        pl.col('VDID').cast(pl.Categorical),
+        pl.sum_horizontal(volume).alias('Volume'),
+        pl.sum_horizontal(weighted).alias('SpeedSum'),
+        'DataCollectTime',
+    )
+    sections = index.join(perVD, on='VDID', how='inner').group_by('SectionID', maintain_order=True).agg(
+        pl.col('VDID').n_unique().cast(pl.UInt16).alias('VDNum'),
+        pl.col('Volume').sum(),
+        (pl.col('SpeedSum').sum() / pl.col('Volume').sum()).cast(pl.Float32).alias('TravelSpeed'),
+        pl.col('DataCollectTime').max(),
+    )
+    return _output(sections.with_columns(
+        pl.col('TravelSpeed').fill_nan(None),
+        pl.col('Volume').cast(pl.Int32),
+    ), df_type)
+
+class _JSONStream:
+    """ Minimal pull tokenizer over a text stream, holding only a bounded window in memory """
+    _decoder = json.JSONDecoder()
+    _whitespace = re.compile('[ \t\r\n\ufeff]*')
+
+    def __init__(self, fp: any, chunk_size: int) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.pin = None
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if (self.eof):
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if (not chunk):
+            self.eof = True
+            return False
+        # Drop consumed text unless an enclosing object still needs it (see `pin`)
+        keep = self.pos if (self.pin is None) else self.pin
+        self.buf = self.buf[keep:] + chunk
+        self.pos -= keep
+        if (self.pin is not None):
+            self.pin = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = self._whitespace.match(self.buf, self.pos).end()
+            if (self.pos < len(self.buf)):
+                return self.buf[self.pos]
+            if (not self._fill()):
+                return ''
+
+    def expect(self, char: str) -> None:
+        if (self.peek() != char):
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of the JSON stream.")
+        self.pos += 1
+
+    def complete(self) -> tuple:
+        """ Decode the next value if it is already buffered in full, else return (None, None) """
+        self.peek()
+        try:
+            value, end = self._decoder.raw_decode(self.buf, self.pos)
+        except json.JSONDecodeError:
+            return None, None
+        text = self.buf[self.pos:end]
+        self.pos = end
+        return value, text
+
+    def value(self) -> tuple:
+        """ Decode the next value & return (value, raw text) """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+                # A number may continue in the next chunk
+                if (end < len(self.buf)) or (self.eof):
+                    text = self.buf[self.pos:end]
+                    self.pos = end
+                    return value, text
+            except json.JSONDecodeError:
+                if (self.eof):
+                    raise
+            self._fill()
+
+def _iterVDLiveItems(fp: any, chunk_size: int = 1 << 20) -> Iterator[tuple]:
+    """ Yield (header, raw VD record) from historical records or real-time `VDLives` documents
+
+    `header` is None for historical records, otherwise the document-level fields.
+    """
+    stream = _JSONStream(fp, chunk_size)
+    while (stream.peek()):
+        # Fast path: historical records (and small documents) fit in the buffer whole
+        value, text = stream.complete()
+        if (text is not None):
+            if (isinstance(value, dict)) and ('VDLives' in value):
+                header = {k: value[k] for k in _HEADER if (k in value)}
+                for item in value['VDLives']:
+                    yield header, json.dumps(item)
+            else:
+                yield None, text
+            continue
+
+        # Keep the object's text around in case it turns out to be a single record
+        stream.pin = stream.pos
+        stream.expect('{')
+        header = {}
+        isDocument = False
+        while (stream.peek() != '}'):
+            key, _ = stream.value()
+            stream.expect(':')
+            if (key == 'VDLives'):
+                isDocument = True
+                stream.pin = None
+                stream.expect('[')
+                while (stream.peek() != ']'):
+                    _, item = stream.value()
+                    yield header, item
+                    if (stream.peek() == ','):
+                        stream.pos += 1
+                stream.expect(']')
+            else:
+                value, _ = stream.value()
+                if (key in _HEADER):
+                    header[key] = value
+            if (stream.peek() == ','):
+                stream.pos += 1
+        stream.expect('}')
+        if (not isDocument):
+            yield None, stream.buf[stream.pin:stream.pos]
+        stream.pin = None
+
+def iterVDDynamicBatches(source: any,
+                         batch_size: int = 10000,
+                         lanes: bool = False,
+                         chunk_size: int = 1 << 20,
+                         df_type: str = 'polars') -> Iterator[any]:
+    """ Stream VD Dynamic Data from a (possibly gzip/zstd compressed) file in fixed-size batches
+
+    `source` is a path or an open file. Both the historical layout (one record per
+    line) and real-time `VDLives` documents are accepted. Each batch covers at most
+    `batch_size` VD records and is shaped like getVDDynamic (or getVDLanes with
+    `lanes=True`), so peak memory depends on `batch_size` rather than the file size.
+    """
+    if (isinstance(source, (str, os.PathLike))):
+        fp = io.TextIOWrapper(open_compressed(os.fspath(source), 'rb'), encoding='utf-8-sig')
+    elif (isinstance(source, io.TextIOBase)):
+        fp = source
+    else:
+        fp = io.TextIOWrapper(source, encoding='utf-8-sig')
+
+    def flush(header: dict, items: list) -> any:
+        records = _readRecords(items, _VD_LIVE)
+        if (header is not None):
+            records = records.with_columns(
+                pl.lit(header.get(k), dtype=pl.String).alias(f"Header{k}") for k in _HEADER
+            )
+        flat = _flattenVDLanes(records, historical=header is None)
+        if (lanes):
+            return _output(flat.drop('_row'), df_type)
+        return _output(_pivotVDLanes(flat, ['_row']), df_type)
+
+    try:
+        header, items = None, []
+        for itemHeader, item in _iterVDLiveItems(fp, chunk_size):
+            if (items) and ((len(items) >= batch_size) or (itemHeader is not header)):
+                yield flush(header, items)
+                items = []
+            header = itemHeader
+            items.append(item)
+        if (items):
+            yield flush(header, items)
+    finally:
+        if (fp is not source):
+            fp.close()
+
+_PARSERS = {
+    'static': lambda contents, date: getVDStatic(contents, date),
+    'dynamic': lambda contents, date: getVDDynamic(contents, date),
+    'lanes': lambda contents, date: getVDLanes(contents, date),
+}
+
+def _parseFiles(paths: list, kind: str, date: str = None) -> bytes:
+    """ Worker: parse historical files serially & return the result as an Arrow IPC buffer """
+    frames = []
+    for path in paths:
+        match = re.search(r'\d{4}-\d{2}-\d{2}', os.path.basename(path))
+        with open_compressed(path, 'rb') as f:
+            contents = [line for line in f.read().decode('utf-8-sig').splitlines() if (line.strip())]
+        frames.append(_PARSERS[kind](contents, match.group() if (match) else date))
+    buf = io.BytesIO()
+    pl.concat(frames).write_ipc(buf)
+    return buf.getvalue()
+
+def ingestVDFiles(pattern: str,
+                  kind: str = 'dynamic',
+                  workers: int = None,
+                  chunksize: int = 1,
+                  date: str = None,
+                  df_type: str = 'polars') -> any:
+    """ Parse downloaded historical VD files matching a glob in a process pool
+
+    `kind` is 'static', 'dynamic' or 'lanes'. Each task parses `chunksize` files and
+    ships the frame back as Arrow IPC; results are concatenated in sorted path order,
+    so the output equals parsing the files one by one. The date of each file is taken
+    from its name, falling back to `date`.
+    """
+    if (kind not in _PARSERS):
+        raise ValueError(f"'{kind}' is not defined.")
+    paths = sorted(glob.glob(pattern))
+    if (not paths):
+        raise FileNotFoundError(f"No file matches '{pattern}'.")
+    chunks = [paths[i:i + chunksize] for i in range(0, len(paths), chunksize)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    if (workers <= 1):
+        buffers = [_parseFiles(chunk, kind, date) for chunk in chunks]
+    else:
+        # Forking a process that already runs the polars thread pool can deadlock
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            buffers = list(pool.map(_parseFiles, chunks, [kind] * len(chunks), [date] * len(chunks)))
+
+    return _output(pl.concat([pl.read_ipc(io.BytesIO(buf)) for buf in buffers]), df_type)
+
+def _timeBound(value: any, end: bool = False) -> datetime:
+    """ 'YYYY-mm-dd' covers the whole day; datetimes & 'YYYY-mm-dd HH:MM:SS' are exact
+
+    Aware datetimes are converted to Asia/Taipei, naive ones & strings are read as Taipei time.
+    """
+    if (isinstance(value, datetime)):
+        bound = value
+    else:
+        bound = datetime.fromisoformat(value)
+        if (end) and (len(value) <= 10):
+            bound += timedelta(days=1) - timedelta(microseconds=1)
+    if (bound.tzinfo is None):
+        return bound.replace(tzinfo=ZoneInfo(TIMEZONE))
+    return bound.astimezone(ZoneInfo(TIMEZONE))
+
+def _timeFilter(col: str, dtype: pl.DataType, start: datetime, end: datetime) -> pl.Expr:
+    """ `start` & `end` are aware (see _timeBound) """
+    if (dtype == pl.String):
+        # 'YYYY-mm-dd HH:MM:SS' strings of Taipei time sort like the timestamps they hold
+        return pl.col(col).is_between(pl.lit(start.strftime('%Y-%m-%d %H:%M:%S')),
+                                      pl.lit(end.strftime('%Y-%m-%d %H:%M:%S')))
+    if (getattr(dtype, 'time_zone', None)):
+        return pl.col(col).is_between(pl.lit(start).dt.convert_time_zone(dtype.time_zone),
+                                      pl.lit(end).dt.convert_time_zone(dtype.time_zone))
+    return pl.col(col).is_between(pl.lit(start.replace(tzinfo=None)), pl.lit(end.replace(tzinfo=None)))
+
+def _storedCategoricals(lf: pl.LazyFrame, schema: dict) -> pl.LazyFrame:
+    """ The store keeps Categorical columns as String (see VDStore); cast them back """
+    return lf.cast({col: pl.Categorical for col, dtype in lf.collect_schema().items()
+                    if (dtype == pl.String) and (schema.get(col) == pl.Categorical)})
+
+def scanVDStatic(city: str, root: str = './vdStore', road_id: any = None) -> pl.LazyFrame:
+    """ Lazily scan all stored VD Static Data of a city """
+    paths = sorted(glob.glob(os.path.join(root, 'vd_static', f"city={city}", '*', 'part.parquet')))
+    if (not paths):
+        return getVDStatic([], date='1970-01-01').lazy()
+    lf = pl.scan_parquet(paths, hive_partitioning=False)
+    if (road_id is not None):
+        lf = lf.filter(pl.col('RoadID').is_in([road_id] if (isinstance(road_id, str)) else list(road_id)))
+    return _storedCategoricals(lf, VD_STATIC_SCHEMA)
+
+def scanVDDynamic(city: str,
+                  start: any,
+                  end: any,
+                  vdid: any = None,
+                  road_id: any = None,
+                  root: str = './vdStore') -> pl.LazyFrame:
+    """ Lazily scan stored VD Dynamic Data of a city between `start` and `end` (inclusive)
+
+    Only the hourly partitions overlapping the window are opened. `vdid` (or `road_id`,
+    resolved to VDIDs through the static data) is pushed into the Parquet scan: rows
+    are sorted by VDID within a partition, so row groups of other VDs are skipped.
+    DataCollectTime is filtered but prunes nothing below the hour, and filters added
+    to the returned frame run after VDID is cast back to Categorical, so they skip no
+    row groups either.
+    """
+    start, end = _timeBound(start), _timeBound(end, end=True)
+    store = VDStore(root)
+    paths = []
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    while (hour <= end):
+        path = store.partition_path('vd_dynamic', city, hour.strftime('%Y-%m-%d'), hour.strftime('%H'))
+        if (os.path.exists(path)):
+            paths.append(path)
+        hour += timedelta(hours=1)
+    if (not paths):
+        return getVDDynamic([], date='1970-01-01').lazy()
+
+    lf = pl.scan_parquet(paths, hive_partitioning=False)
+    lf = lf.filter(_timeFilter('DataCollectTime', lf.collect_schema()['DataCollectTime'], start, end))
+
+    vdids = None
+    if (vdid is not None):
+        vdids = [vdid] if (isinstance(vdid, str)) else list(vdid)
+    if (road_id is not None):
+        roadVDs = scanVDStatic(city, root, road_id).select(pl.col('VDID').unique()).collect()['VDID'].to_list()
+        vdids = roadVDs if (vdids is None) else sorted(set(vdids) & set(roadVDs))
+    if (vdids is not None):
+        lf = lf.filter(pl.col('VDID').is_in(vdids))
+    return _storedCategoricals(lf, VD_DYNAMIC_SCHEMA)
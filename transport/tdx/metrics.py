@@ -0,0 +1,147 @@
+import time
+import bisect
+import inspect
+import functools
+import threading
+
+
+# Latency buckets (seconds), from in-memory parsing up to slow historical downloads
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labelText(labels: tuple, extra: str = None) -> str:
+    items = [
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in labels
+    ]
+    if (extra):
+        items.append(extra)
+    return '{' + ','.join(items) + '}' if (items) else ''
+
+
+class Registry:
+    """ Opt-in latency histograms & counters, rendered in the Prometheus text format
+
+    Nothing is recorded until `enable()`; a disabled `timed` wrapper costs a single
+    attribute check on top of the call. Cache statistics registered with
+    `register_cache` are read when rendering, so they are exported either way.
+    """
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.enabled = False
+        self._histograms = {}
+        self._counters = {}
+        self._caches = []
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def observe(self, name: str, value: float, labels: dict = None) -> None:
+        key = (name, tuple(sorted(labels.items())) if (labels) else ())
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if (histogram is None):
+                # Per-bucket counts (made cumulative when rendered), sum, count
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][bisect.bisect_left(self.buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def inc(self, name: str, value: float = 1, labels: dict = None) -> None:
+        key = (name, tuple(sorted(labels.items())) if (labels) else ())
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register_cache(self, cache: str, stats: callable, hits: str = 'hits', misses: str = 'misses') -> None:
+        """ Export `stats()[hits]` & `stats()[misses]` as the hit / miss counters of `cache` """
+        self._caches.append((cache, stats, hits, misses))
+
+    def timed(self, name: str, labels: any = None, records: callable = None, size: callable = None) -> callable:
+        """ Decorator recording <name>_seconds, and optionally <name>_records_total & <name>_bytes_total
+
+        `labels` is a dict, or a callable given the bound arguments (defaults applied) of
+        the call. `records` & `size` are given the return value; exceptions are counted
+        in <name>_errors_total.
+        """
+        def decorator(fn: callable) -> callable:
+            signature = inspect.signature(fn) if (callable(labels)) else None
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if (not self.enabled):
+                    return fn(*args, **kwargs)
+                if (signature):
+                    bound = signature.bind(*args, **kwargs)
+                    bound.apply_defaults()
+                    callLabels = labels(bound.arguments)
+                else:
+                    callLabels = labels
+                start = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException:
+                    self.inc(f"{name}_errors_total", labels=callLabels)
+                    raise
+                finally:
+                    self.observe(f"{name}_seconds", time.perf_counter() - start, callLabels)
+                if (records):
+                    self.inc(f"{name}_records_total", records(result), callLabels)
+                if (size):
+                    self.inc(f"{name}_bytes_total", size(result), callLabels)
+                return result
+            return wrapper
+        return decorator
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = {key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        seen = set()
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            if (name not in seen):
+                seen.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _labelText(labels, f'le="{bound}"')
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            le = _labelText(labels, 'le="+Inf"')
+            lines.append(f"{name}_bucket{le} {count}")
+            lines.append(f"{name}_sum{_labelText(labels)} {total}")
+            lines.append(f"{name}_count{_labelText(labels)} {count}")
+
+        for (name, labels), value in sorted(counters.items()):
+            if (name not in seen):
+                seen.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_labelText(labels)} {value}")
+
+        if (self._caches):
+            samples = {'tdx_cache_hits_total': [], 'tdx_cache_misses_total': [], 'tdx_cache_hit_ratio': []}
+            for cache, stats, hits, misses in self._caches:
+                values = stats()
+                labels = (('cache', cache),)
+                samples['tdx_cache_hits_total'].append((labels, values[hits]))
+                samples['tdx_cache_misses_total'].append((labels, values[misses]))
+                lookups = values[hits] + values[misses]
+                samples['tdx_cache_hit_ratio'].append((labels, values[hits] / lookups if (lookups) else 0.0))
+            for name, values in samples.items():
+                lines.append(f"# TYPE {name} {'gauge' if (name.endswith('ratio')) else 'counter'}")
+                lines += [f"{name}{_labelText(labels)} {value}" for labels, value in values]
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+timed = REGISTRY.timed
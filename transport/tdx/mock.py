@@ -0,0 +1,518 @@
+import json
+import time
+import random
+import secrets
+import argparse
+import threading
+from collections import Counter
+from urllib.parse import urlsplit, parse_qs, unquote
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .crawler import Crawler
+
+
+TDX_URL = 'https://tdx.transportdata.tw'
+TAIPEI = timezone(timedelta(hours=8))
+
+# RoadClass: (name suffix, free-flow speed in km/h)
+_ROAD_CLASSES = {0: ('國道', 100), 1: ('快速公路', 85), 2: ('快速道路', 70), 3: ('省道', 60), 4: ('縣道', 50), 6: ('路', 45)}
+_TOWNS = ('中正區', '大同區', '中山區', '松山區', '大安區', '萬華區', '信義區', '士林區', '北投區', '內湖區', '南港區', '文山區')
+_BEARINGS = ('N', 'E', 'S', 'W')
+# Level, LevelName, LowValue, TopValue (TravelSpeed in km/h)
+_CONGESTION_LEVELS = (('1', '順暢', 50, 200), ('2', '車多', 35, 50), ('3', '車多壅塞', 20, 35), ('4', '壅塞', 0, 20))
+
+# target: (key of the records in a real-time document, records per minute instead of per day)
+TARGETS = {
+    '/VD': ('VDs', False),
+    '/Live/VD': ('VDLives', True),
+    '/Section': ('Sections', False),
+    '/Live': ('LiveTraffics', True),
+    '/SectionLink': ('SectionLinks', False),
+    '/SectionShape': ('SectionShapes', False),
+    '/CongestionLevel': ('CongestionLevels', False),
+}
+
+
+def _tdxTime(t: datetime) -> str:
+    return t.astimezone(TAIPEI).strftime('%Y-%m-%dT%H:%M:%S+08:00')
+
+
+def _demand(minute: datetime) -> float:
+    """ Daily demand: quiet at night, peaks around 08:00 & 18:00 """
+    hour = minute.astimezone(TAIPEI).hour + minute.minute / 60
+    return 0.15 + 0.85 * max(0.0, min(1.0, 1.2 - min(abs(hour - 8), abs(hour - 18)) / 4)) \
+        if (6 <= hour < 22) else 0.1
+
+
+def _mile(km: float) -> str:
+    return f"{int(km)}K+{round(km % 1 * 1000):03d}"
+
+
+class SyntheticTDX:
+    """ Seedable generator of TDX-shaped VD, Live VD, Link & Section payloads
+
+    Detector layout (positions, links, lanes, RoadClass) is fixed by `seed`; the traffic
+    of every minute is derived from (`seed`, VD, minute), so any minute can be produced
+    on its own and always comes out the same. Speeds & volumes follow a daily profile
+    with morning & evening peaks, and `error_rate` of the lanes report -99 values.
+    Sections chain `links_per_section` consecutive detector links; their live traffic
+    follows the same profile.
+
+    Both payload shapes the parsers branch on are produced for every target in TARGETS:
+    real-time documents (header fields + 'VDs' / 'VDLives' / 'Sections' / ...) and
+    historical records (one JSON object per line, with their own AuthorityCode /
+    InfoTime / UpdateTime, and CountyName / TownName and RecurrentTimes for VDs).
+    """
+    def __init__(self,
+                 seed: int = 0,
+                 vds: int = 500,
+                 lanes: tuple = (1, 4),
+                 links_per_vd: tuple = (1, 2),
+                 city: str = 'Taipei',
+                 error_rate: float = 0.01,
+                 authority: str = 'TPE',
+                 links_per_section: int = 4) -> None:
+        self.seed = seed
+        self.city = city
+        self.error_rate = error_rate
+        self.authority = authority
+        rng = random.Random(f"{seed}:layout")
+        self.vds = []
+        self.links = {}
+        for i in range(vds):
+            roadClass = rng.choice(list(_ROAD_CLASSES))
+            roadName = f"{rng.choice('中山忠孝仁愛信義和平民生民權承德基隆復興')}{_ROAD_CLASSES[roadClass][0]}"
+            links = []
+            for k in range(rng.randint(*links_per_vd)):
+                linkID = f"{seed % 10}{i:06d}{k:02d}00"
+                links.append({'LinkID': linkID, 'Bearing': _BEARINGS[(i + 2 * k) % 4],
+                               'RoadDirection': _BEARINGS[(i + 2 * k) % 4],
+                               'LaneNum': rng.randint(*lanes)})
+                self.links[linkID] = {'RoadClass': roadClass, 'RoadName': roadName}
+            self.vds.append({
+                'VDID': f"VD-{authority}-{i:05d}",
+                'RoadClass': roadClass,
+                'RoadID': f"{roadClass}{i % 97:05d}",
+                'RoadName': roadName,
+                'PositionLon': round(rng.uniform(121.457, 121.665), 6),
+                'PositionLat': round(rng.uniform(24.961, 25.210), 6),
+                'TownName': rng.choice(_TOWNS),
+                'BiDirectional': int(len(links) > 1),
+                'Links': links,
+            })
+
+        chain = [(vd, link) for vd in self.vds for link in vd['Links']]
+        self.sections = []
+        for n, start in enumerate(range(0, len(chain), links_per_section)):
+            part = chain[start:start + links_per_section]
+            vd = part[0][0]
+            points = []
+            for v, _ in part:
+                if ((v['PositionLon'], v['PositionLat']) not in points):
+                    points.append((v['PositionLon'], v['PositionLat']))
+            if (len(points) == 1):
+                points.append((round(points[0][0] + 0.001, 6), round(points[0][1] + 0.001, 6)))
+            self.sections.append({
+                'SectionID': f"{authority}{seed % 10}{n:05d}",
+                'RoadID': vd['RoadID'],
+                'RoadName': vd['RoadName'],
+                'RoadClass': vd['RoadClass'],
+                'RoadDirection': part[0][1]['RoadDirection'],
+                'Start': vd['TownName'],
+                'End': part[-1][0]['TownName'],
+                # Links are 0.3 km long (see link_records)
+                'StartKM': 0.3 * start,
+                'SectionLength': round(0.3 * len(part), 1),
+                'SpeedLimit': _ROAD_CLASSES[vd['RoadClass']][1],
+                'LinkIDs': [link['LinkID'] for _, link in part],
+                'Points': points,
+            })
+
+    # Static data
+    def vd_record(self, vd: dict, t: datetime, historical: bool) -> dict:
+        record = {
+            'VDID': vd['VDID'],
+            'SubAuthorityCode': f"{self.authority}-01",
+            'BiDirectional': vd['BiDirectional'],
+            'DetectionLinks': [{**link, 'ActualLaneNum': link['LaneNum']} for link in vd['Links']],
+            'VDType': 2,
+            'LocationType': 1,
+            'DetectionType': 5,
+            'PositionLon': vd['PositionLon'],
+            'PositionLat': vd['PositionLat'],
+            'RoadID': vd['RoadID'],
+            'RoadName': vd['RoadName'],
+            'RoadClass': vd['RoadClass'],
+        }
+        if (historical):
+            record.update(AuthorityCode=self.authority, CountyName='臺北市', TownName=vd['TownName'],
+                          InfoTime=_tdxTime(t), UpdateTime=_tdxTime(t + timedelta(seconds=5)))
+        return record
+
+    def vd_document(self, t: datetime) -> dict:
+        """ Real-time /VD response """
+        return self.document('/VD', t)
+
+    def link_records(self, link_ids: list) -> list:
+        """ /LinkID response; unknown LinkIDs are left out like TDX does """
+        return [
+            {'LinkID': link_id, 'RoadClass': self.links[link_id]['RoadClass'],
+             'RoadName': self.links[link_id]['RoadName'], 'SectionLength': 0.3}
+            for link_id in link_ids if (link_id in self.links)
+        ]
+
+    # Dynamic data
+    def vd_live_record(self, index: int, minute: datetime, historical: bool) -> dict:
+        vd = self.vds[index]
+        rng = random.Random(f"{self.seed}:{index}:{minute.timestamp():.0f}")
+        freeFlow = _ROAD_CLASSES[vd['RoadClass']][1]
+        demand = _demand(minute)
+        flows = []
+        for link in vd['Links']:
+            lanes = []
+            for laneID in range(link['LaneNum']):
+                if (rng.random() < self.error_rate):
+                    lanes.append(self._lane(laneID, -99, -99, [(v, -99, -99) for v in 'SLTM'], historical, rng))
+                    continue
+                speed = max(5.0, freeFlow * (1.05 - 0.6 * demand) + rng.gauss(0, 5))
+                volumes = {'S': rng.randint(0, int(25 * demand) + 1), 'L': rng.randint(0, int(3 * demand) + 1),
+                           'T': rng.randint(0, int(2 * demand) + 1), 'M': rng.randint(0, int(15 * demand) + 1)}
+                vehicles = [
+                    (v, volume, round(max(0.0, speed + rng.gauss(0, 4)), 1) if (volume > 0) else 0)
+                    for v, volume in volumes.items()
+                ]
+                occupancy = round(min(100.0, sum(volumes.values()) * 0.6 * (freeFlow / speed) ** 0.5), 1)
+                lanes.append(self._lane(laneID, round(speed, 1), occupancy, vehicles, historical, rng))
+            flows.append({'LinkID': link['LinkID'], 'Lanes': lanes})
+
+        record = {'VDID': vd['VDID'], 'SubAuthorityCode': f"{self.authority}-01", 'LinkFlows': flows,
+                  'Status': 0, 'DataCollectTime': _tdxTime(minute)}
+        if (historical):
+            record.update(AuthorityCode=self.authority, InfoTime=_tdxTime(minute + timedelta(seconds=40)),
+                          UpdateTime=_tdxTime(minute + timedelta(seconds=55)))
+        return record
+
+    def _lane(self, laneID: int, speed: float, occupancy: float, vehicles: list,
+              historical: bool, rng: random.Random) -> dict:
+        lane = {'LaneID': laneID, 'LaneType': 1, 'Speed': speed, 'Occupancy': occupancy,
+                'Vehicles': [{'VehicleType': v, 'Volume': volume, 'Speed': s} for v, volume, s in vehicles]}
+        if (historical):
+            lane['RecurrentTimes'] = rng.randint(0, 2)
+        return lane
+
+    def vd_live_document(self, t: datetime) -> dict:
+        """ Real-time /Live/VD response for the minute containing `t` """
+        return self.document('/Live/VD', t)
+
+    # Section data
+    def section_record(self, section: dict, t: datetime, historical: bool) -> dict:
+        record = {
+            'SectionID': section['SectionID'],
+            'SectionName': f"{section['RoadName']}({section['Start']}-{section['End']})",
+            'RoadID': section['RoadID'],
+            'RoadName': section['RoadName'],
+            'RoadClass': section['RoadClass'],
+            'RoadDirection': section['RoadDirection'],
+            'RoadSection': {'Start': section['Start'], 'End': section['End']},
+            'SectionLength': section['SectionLength'],
+            'SectionMile': {'StartKM': _mile(section['StartKM']),
+                            'EndKM': _mile(section['StartKM'] + section['SectionLength'])},
+            'SpeedLimit': section['SpeedLimit'],
+        }
+        return {**record, **self._meta(t)} if (historical) else record
+
+    def section_live_record(self, index: int, minute: datetime, historical: bool) -> dict:
+        section = self.sections[index]
+        rng = random.Random(f"{self.seed}:section:{index}:{minute.timestamp():.0f}")
+        if (rng.random() < self.error_rate):
+            travelTime, speed, level = -99, -99, '-99'
+        else:
+            speed = round(max(5.0, section['SpeedLimit'] * (1.05 - 0.6 * _demand(minute)) + rng.gauss(0, 5)))
+            travelTime = round(section['SectionLength'] / speed * 3600)
+            level = next(level for level, _, low, _ in _CONGESTION_LEVELS if (speed >= low))
+        record = {
+            'SectionID': section['SectionID'], 'TravelTime': travelTime, 'TravelSpeed': speed,
+            'CongestionLevelID': '1', 'CongestionLevel': level,
+            'HasHistorical': 0, 'HasVD': 1, 'HasAVI': 0, 'HasETAG': 0, 'HasGVP': 0, 'HasCVP': 0, 'HasOthers': 0,
+            'DataCollectTime': _tdxTime(minute),
+        }
+        return {**record, **self._meta(minute + timedelta(seconds=40))} if (historical) else record
+
+    def section_link_record(self, section: dict, t: datetime, historical: bool) -> dict:
+        record = {'SectionID': section['SectionID'], 'LinkIDs': [{'LinkID': i} for i in section['LinkIDs']]}
+        return {**record, **self._meta(t)} if (historical) else record
+
+    def section_shape_record(self, section: dict, t: datetime, historical: bool) -> dict:
+        geometry = ', '.join(f"{lon} {lat}" for lon, lat in section['Points'])
+        record = {'SectionID': section['SectionID'], 'Geometry': f"LINESTRING({geometry})"}
+        return {**record, **self._meta(t)} if (historical) else record
+
+    def congestion_level_records(self, t: datetime, historical: bool) -> list:
+        record = {
+            'CongestionLevelID': '1',
+            'CongestionLevelName': '速率',
+            'Levels': [{'Level': level, 'LevelName': name, 'TopValue': top, 'LowValue': low}
+                       for level, name, low, top in _CONGESTION_LEVELS],
+        }
+        return [{**record, **self._meta(t)} if (historical) else record]
+
+    def records(self, target: str, t: datetime, historical: bool) -> list:
+        """ Records of `target` at `t` (a whole minute for per-minute targets) """
+        if (target == '/VD'):
+            return [self.vd_record(vd, t, historical) for vd in self.vds]
+        if (target == '/Live/VD'):
+            return [self.vd_live_record(i, t, historical) for i in range(len(self.vds))]
+        if (target == '/Section'):
+            return [self.section_record(section, t, historical) for section in self.sections]
+        if (target == '/Live'):
+            return [self.section_live_record(i, t, historical) for i in range(len(self.sections))]
+        if (target == '/SectionLink'):
+            return [self.section_link_record(section, t, historical) for section in self.sections]
+        if (target == '/SectionShape'):
+            return [self.section_shape_record(section, t, historical) for section in self.sections]
+        if (target == '/CongestionLevel'):
+            return self.congestion_level_records(t, historical)
+        raise ValueError(f"'{target}' is not defined.")
+
+    def document(self, target: str, t: datetime) -> dict:
+        """ Real-time response of `target`; per-minute targets use the minute containing `t` """
+        key, perMinute = TARGETS[target]
+        records = self.records(target, t.replace(second=0, microsecond=0) if (perMinute) else t, historical=False)
+        return {**self._header(t), key: records}
+
+    # Historical files
+    def historical_lines(self, target: str, dates: str, interval: int = 1) -> iter:
+        """ Lines of a historical file of `target` for 'YYYY-mm-dd' or 'start~end' """
+        perMinute = TARGETS[target][1]
+        start, _, end = dates.partition('~')
+        day = datetime.strptime(start, '%Y-%m-%d').replace(tzinfo=TAIPEI)
+        last = datetime.strptime(end or start, '%Y-%m-%d').replace(tzinfo=TAIPEI)
+        first = True
+        while (day <= last):
+            if (perMinute):
+                records = (
+                    record for m in range(0, 24 * 60, interval)
+                    for record in self.records(target, day + timedelta(minutes=m), historical=True)
+                )
+            else:
+                records = self.records(target, day, historical=True)
+            for record in records:
+                # Downloaded TDX files start with a UTF-8 BOM
+                yield ('\ufeff' if (first) else '') + json.dumps(record, ensure_ascii=False)
+                first = False
+            day += timedelta(days=1)
+
+    def _meta(self, t: datetime) -> dict:
+        return {'AuthorityCode': self.authority, 'InfoTime': _tdxTime(t),
+                'UpdateTime': _tdxTime(t + timedelta(seconds=15))}
+
+    def _header(self, t: datetime) -> dict:
+        return {'UpdateTime': _tdxTime(t), 'UpdateInterval': 60,
+                'SrcUpdateTime': _tdxTime(t - timedelta(seconds=20)), 'AuthorityCode': self.authority}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        self.server.mock.handle(self, 'GET')
+
+    def do_POST(self) -> None:
+        self.server.mock.handle(self, 'POST')
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class MockTDXServer:
+    """ Local stand-in for the TDX auth, VD & Section endpoints, backed by SyntheticTDX
+
+    Served routes (query strings as built by Crawler.response), <target> being any of
+    TARGETS (/VD, /Live/VD, /Section, /Live, /SectionLink, /SectionShape, /CongestionLevel):
+        POST /auth/realms/TDXConnect/protocol/openid-connect/token
+        GET  /api/basic/v2/Road/Traffic<target>/City/<City>
+        POST /api/basic/v2/Road/Link/LinkID           (JSON list of LinkIDs)
+        GET  /api/basic/v2/Road/Link/LinkID/<LinkID>
+        GET  /api/historical/v2/Historical/Road/Traffic<target>/City/<City>?Dates=...
+
+    API calls need a token from the auth route (401 otherwise). `latency` (+ up to
+    `jitter`) seconds is added to every response, and API calls are answered with 429
+    & Retry-After at `throttle_rate` (seeded) or on every `throttle_every`-th call.
+    `now` pins the real-time clock for reproducible payloads.
+    """
+    auth_path = '/auth/realms/TDXConnect/protocol/openid-connect/token'
+
+    def __init__(self,
+                 synthetic: SyntheticTDX = None,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 throttle_rate: float = 0.0,
+                 throttle_every: int = None,
+                 retry_after: int = 1,
+                 token_ttl: int = 86400,
+                 history_interval: int = 1,
+                 now: datetime = None,
+                 seed: int = 0) -> None:
+        self.synthetic = synthetic if (synthetic) else SyntheticTDX(seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.token_ttl = token_ttl
+        self.history_interval = history_interval
+        self.now = now
+        self.stats = Counter()
+        self._tokens = {}
+        self._calls = 0
+        self._rng = random.Random(f"{seed}:server")
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockTDXServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-tdx', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if (self._thread):
+            self._thread.join()
+
+    def __enter__(self) -> 'MockTDXServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def configure(self, *crawlers: Crawler) -> None:
+        """ Point crawlers at this server instead of TDX """
+        for crawler in crawlers:
+            crawler.api_url = crawler.api_url.replace(TDX_URL, self.url)
+            crawler.auth_url = crawler.auth_url.replace(TDX_URL, self.url)
+
+    def handle(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        if (self.latency) or (self.jitter):
+            time.sleep(self.latency + self._rng.random() * self.jitter)
+        url = urlsplit(request.path)
+        path = unquote(url.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(request.headers.get('Content-Length') or 0)
+        body = request.rfile.read(length) if (length) else b''
+
+        if (method == 'POST') and (path == self.auth_path):
+            return self._token(request, body)
+        if (not path.startswith('/api/')):
+            return self._send(request, 404, {'message': f"No route for {path}"})
+
+        with self._lock:
+            self._calls += 1
+            throttled = (self.throttle_every and self._calls % self.throttle_every == 0) \
+                or (self._rng.random() < self.throttle_rate)
+        if (throttled):
+            return self._send(request, 429, {'message': 'API rate limit exceeded'},
+                              headers={'Retry-After': str(self.retry_after)})
+        if (not self._authorized(request)):
+            return self._send(request, 401, {'message': 'Unauthorized'})
+
+        synthetic = self.synthetic
+        now = self.now if (self.now) else datetime.now(TAIPEI)
+        city = path.rsplit('/City/', 1)[-1] if ('/City/' in path) else None
+        if (city is not None) and (city != synthetic.city):
+            return self._send(request, 200, {**synthetic._header(now), **{key: [] for key, _ in TARGETS.values()}})
+
+        for target, (key, _) in TARGETS.items():
+            if (method == 'GET') and (path == f"/api/basic/v2/Road/Traffic{target}/City/{city}"):
+                doc = synthetic.document(target, now)
+                doc[key] = self._page(doc[key], query)
+                return self._send(request, 200, doc)
+        if (path.startswith('/api/basic/v2/Road/Link/LinkID')):
+            if (method == 'POST'):
+                link_ids = json.loads(body or b'[]')
+            else:
+                link_ids = [path.rsplit('/', 1)[-1]]
+            return self._send(request, 200, synthetic.link_records(link_ids))
+        for target in TARGETS:
+            if (method == 'GET') and (path == f"/api/historical/v2/Historical/Road/Traffic{target}/City/{city}"):
+                if ('Dates' not in query):
+                    return self._send(request, 400, {'message': 'Dates is required'})
+                lines = synthetic.historical_lines(target, query['Dates'], self.history_interval)
+                return self._stream(request, lines)
+        return self._send(request, 404, {'message': f"No route for {path}"})
+
+    def _token(self, request: BaseHTTPRequestHandler, body: bytes) -> None:
+        form = {k: v[-1] for k, v in parse_qs(body.decode()).items()}
+        if (not form.get('client_id')) or (not form.get('client_secret')):
+            return self._send(request, 400, {'error': 'invalid_client'})
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._tokens[token] = time.monotonic() + self.token_ttl
+        self._send(request, 200, {'access_token': token, 'expires_in': self.token_ttl, 'token_type': 'Bearer'})
+
+    def _authorized(self, request: BaseHTTPRequestHandler) -> bool:
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        with self._lock:
+            expires = self._tokens.get(token)
+        return (scheme == 'Bearer') and (expires is not None) and (time.monotonic() < expires)
+
+    def _page(self, items: list, query: dict) -> list:
+        skip = int(query.get('$skip', 0))
+        top = int(query['$top']) if ('$top' in query) else None
+        return items[skip:] if (top is None) else items[skip:skip + top]
+
+    def _send(self, request: BaseHTTPRequestHandler, status: int, payload: any, headers: dict = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.stats[status] += 1
+        request.send_response(status)
+        request.send_header('Content-Type', 'application/json; charset=utf-8')
+        request.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            request.send_header(key, value)
+        request.end_headers()
+        request.wfile.write(body)
+
+    def _stream(self, request: BaseHTTPRequestHandler, lines: iter) -> None:
+        """ Send a historical file without building it in memory (ends with the connection) """
+        self.stats[200] += 1
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/json; charset=utf-8')
+        request.send_header('Connection', 'close')
+        request.end_headers()
+        request.close_connection = True
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if (len(batch) >= 1000):
+                request.wfile.write(('\n'.join(batch) + '\n').encode('utf-8'))
+                batch = []
+        if (batch):
+            request.wfile.write('\n'.join(batch).encode('utf-8'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vds', type=int, default=500, help='number of detectors')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of API calls answered with 429')
+    parser.add_argument('--history-interval', type=int, default=1, help='minutes between historical records')
+    args = parser.parse_args()
+
+    server = MockTDXServer(SyntheticTDX(seed=args.seed, vds=args.vds), port=args.port, latency=args.latency,
+                           throttle_rate=args.throttle_rate, history_interval=args.history_interval,
+                           seed=args.seed)
+    print(f"Mock TDX listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,130 @@
+import numpy as np
+import polars as pl
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from .data import TIMEZONE, VEHICLE_TYPES, _output
+
+
+class VDRollingWindow:
+    """ Incremental rolling volume / speed / occupancy per VD, fed with getVDDynamic output
+
+    Every VD owns a row of minute-indexed ring buffers (`capacity` minutes long), so adding
+    a minute of data is a constant-time write per VD and old minutes fall out by being
+    overwritten. A (VDID, DataCollectTime) pair is only counted once: re-polled minutes
+    and minutes older than the ring are skipped. Negative (error) values are ignored.
+
+    Per VD & minute the buffers hold:
+        volume          total volume of all vehicle types
+        speedSum        sum of volume * speed over vehicle types with a valid speed
+        speedVolume     volume of those vehicle types (the weights of speedSum)
+        occupancy       lane occupancy (NaN when missing)
+    """
+    def __init__(self, capacity: int = 60, windows: tuple = (5, 15, 60), initial_vds: int = 1024) -> None:
+        if (max(windows) > capacity):
+            raise ValueError(f"Windows must not exceed the capacity of {capacity} minutes.")
+        self.capacity = capacity
+        self.windows = tuple(windows)
+        self.vdids = []
+        self._rows = {}
+        self.latest = None
+        self.stats = {'accepted': 0, 'duplicates': 0, 'expired': 0}
+        self._allocate(initial_vds)
+
+    def _allocate(self, n: int) -> None:
+        """ (Re)size the buffers to `n` VDs, keeping their contents """
+        for name, fill, dtype in (('minutes', -1, np.int64),
+                                  ('volume', 0.0, np.float64),
+                                  ('speedSum', 0.0, np.float64),
+                                  ('speedVolume', 0.0, np.float64),
+                                  ('occupancy', np.nan, np.float64)):
+            grown = np.full((n, self.capacity), fill, dtype=dtype)
+            current = getattr(self, name, None)
+            if (current is not None):
+                grown[:len(current)] = current
+            setattr(self, name, grown)
+
+    def _rowsOf(self, vdids: list) -> np.ndarray:
+        rows = np.empty(len(vdids), dtype=np.int64)
+        for i, vdid in enumerate(vdids):
+            row = self._rows.get(vdid)
+            if (row is None):
+                row = self._rows[vdid] = len(self.vdids)
+                self.vdids.append(vdid)
+            rows[i] = row
+        if (len(self.vdids) > len(self.minutes)):
+            self._allocate(max(len(self.vdids), 2 * len(self.minutes)))
+        return rows
+
+    def update(self, vdDynamic: pl.DataFrame) -> int:
+        """ Add getVDDynamic rows; return how many VD-minutes were new """
+        volumes = [pl.col(f"{name}Volume").cast(pl.Float64) for name in VEHICLE_TYPES.values()]
+        speeds = [pl.col(f"{name}Speed").cast(pl.Float64) for name in VEHICLE_TYPES.values()]
+        validVolumes = [pl.when(v > 0).then(v).otherwise(0.0) for v in volumes]
+        weights = [pl.when((v > 0) & (s >= 0)).then(v).otherwise(0.0) for v, s in zip(volumes, speeds)]
+        batch = (
+            vdDynamic
+            .filter(pl.col('VDID').is_not_null() & pl.col('DataCollectTime').is_not_null())
+            .unique(subset=['VDID', 'DataCollectTime'], keep='first', maintain_order=True)
+            .select(
+                pl.col('VDID').cast(pl.String),
+                (pl.col('DataCollectTime').dt.epoch('s') // 60).alias('minute'),
+                pl.sum_horizontal(validVolumes).alias('volume'),
+                pl.sum_horizontal([w * s for w, s in zip(weights, speeds)]).fill_nan(0.0).alias('speedSum'),
+                pl.sum_horizontal(weights).alias('speedVolume'),
+                pl.when(pl.col('Occupancy') >= 0).then(pl.col('Occupancy').cast(pl.Float64))
+                .otherwise(np.nan).alias('occupancy'),
+            )
+        )
+        if (batch.height == 0):
+            return 0
+
+        rows = self._rowsOf(batch['VDID'].to_list())
+        minutes = batch['minute'].to_numpy()
+        latest = max(int(minutes.max()), self.latest if (self.latest is not None) else -1)
+        slots = minutes % self.capacity
+        occupant = self.minutes[rows, slots]
+        fresh = minutes > latest - self.capacity
+        # A slot holding this very minute is a duplicate; one holding a later minute wins
+        accept = fresh & (minutes > occupant)
+        self.stats['accepted'] += int(accept.sum())
+        self.stats['duplicates'] += int((fresh & (minutes == occupant)).sum())
+        self.stats['expired'] += int((~fresh | (minutes < occupant)).sum())
+
+        rows, slots = rows[accept], slots[accept]
+        self.minutes[rows, slots] = minutes[accept]
+        for name in ('volume', 'speedSum', 'speedVolume', 'occupancy'):
+            getattr(self, name)[rows, slots] = batch[name].to_numpy()[accept]
+        self.latest = latest
+        return len(rows)
+
+    def snapshot(self, now: datetime = None, df_type: str = 'polars') -> any:
+        """ Rolling aggregates of every VD over the windows ending at `now` (default: latest minute)
+
+        A naive `now` is read as Asia/Taipei time, as in scanVDDynamic. Columns per window
+        W: VolumeWMin (total), SpeedWMin (volume-weighted), OccupancyWMin (mean) &
+        SamplesWMin (minutes with data).
+        """
+        n = len(self.vdids)
+        if (now is None):
+            end = self.latest if (self.latest is not None) else 0
+        else:
+            if (now.tzinfo is None):
+                now = now.replace(tzinfo=ZoneInfo(TIMEZONE))
+            end = int(now.timestamp()) // 60
+        age = end - self.minutes[:n]
+        hasOccupancy = ~np.isnan(self.occupancy[:n])
+        occupancy = np.where(hasOccupancy, self.occupancy[:n], 0.0)
+
+        columns = {'VDID': pl.Series('VDID', self.vdids, dtype=pl.String).cast(pl.Categorical)}
+        for window in self.windows:
+            inWindow = (self.minutes[:n] >= 0) & (age >= 0) & (age < window)
+            speedVolume = (self.speedVolume[:n] * inWindow).sum(axis=1)
+            occupancyCount = (hasOccupancy & inWindow).sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                speed = (self.speedSum[:n] * inWindow).sum(axis=1) / speedVolume
+                occ = (occupancy * inWindow).sum(axis=1) / occupancyCount
+            columns[f"Volume{window}Min"] = pl.Series((self.volume[:n] * inWindow).sum(axis=1))
+            columns[f"Speed{window}Min"] = pl.Series(np.where(speedVolume > 0, speed, np.nan)).fill_nan(None)
+            columns[f"Occupancy{window}Min"] = pl.Series(np.where(occupancyCount > 0, occ, np.nan)).fill_nan(None)
+            columns[f"Samples{window}Min"] = pl.Series(inWindow.sum(axis=1), dtype=pl.Int16)
+        return _output(pl.DataFrame(columns), df_type)
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import polars as pl
+from .crawler import chmod_default
+
+
+def write_parquet_atomic(df: pl.DataFrame, path: str, **kwargs) -> None:
+    """ Write to a temporary file next to `path`, then atomically replace it
+
+    Readers never see a half-written file. `kwargs` go to DataFrame.write_parquet.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.parquet.part')
+    try:
+        try:
+            chmod_default(fd)
+        finally:
+            os.close(fd)
+        df.write_parquet(tmp_path, **kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class VDStore:
+    """ Parquet store of parsed VD data, partitioned by city / date (/ hour)
+
+    Layout (hive-style, readable with `pl.scan_parquet(..., hive_partitioning=True)`):
+        <root>/vd_dynamic/city=<City>/date=<YYYY-mm-dd>/hour=<HH>/part.parquet
+        <root>/vd_static/city=<City>/date=<YYYY-mm-dd>/part.parquet
+    Writes are upserts: rows whose keys already exist in a partition are replaced, so
+    re-ingesting the same files never duplicates rows. Categorical columns are stored
+    as String: polars keeps no usable statistics for them, so filters on VDID could
+    not skip row groups.
+    """
+    datasets = {
+        # dataset: (time column, upsert keys, hourly partitions)
+        'vd_dynamic': ('DataCollectTime', ['VDID', 'DataCollectTime'], True),
+        'vd_static': ('InfoTime', ['VDID', 'InfoTime'], False),
+    }
+
+    def __init__(self,
+                 root: str,
+                 compression: str = 'zstd',
+                 compression_level: int = 3,
+                 row_group_size: int = 8192) -> None:
+        self.root = root
+        self.compression = compression
+        self.compression_level = compression_level
+        # Rows are sorted by VDID & time before writing, so smaller row groups mean
+        # tighter min/max statistics for filters on VDID. An hourly partition of a city
+        # holds ~60 rows per VD, so 8192 rows span ~135 VDs
+        self.row_group_size = row_group_size
+
+    def write_dynamic(self, df: pl.DataFrame, city: str) -> list:
+        """ Upsert getVDDynamic output; return the partition files written """
+        return self._upsert('vd_dynamic', df, city)
+
+    def write_static(self, df: pl.DataFrame, city: str) -> list:
+        """ Upsert getVDStatic output; return the partition files written """
+        return self._upsert('vd_static', df, city)
+
+    def partition_path(self, dataset: str, city: str, date: str, hour: str = None) -> str:
+        path = os.path.join(self.root, dataset, f"city={city}", f"date={date}")
+        if (hour is not None):
+            path = os.path.join(path, f"hour={hour}")
+        return os.path.join(path, 'part.parquet')
+
+    def _upsert(self, dataset: str, df: pl.DataFrame, city: str) -> list:
+        timeCol, keys, hourly = self.datasets[dataset]
+        # Rows without a timestamp cannot be placed in a partition
+        df = self._plain(df.filter(pl.col(timeCol).is_not_null()))
+        if (df.schema[timeCol] == pl.String):
+            date, hour = pl.col(timeCol).str.slice(0, 10), pl.col(timeCol).str.slice(11, 2)
+        else:
+            date, hour = pl.col(timeCol).dt.strftime('%Y-%m-%d'), pl.col(timeCol).dt.strftime('%H')
+        partitions = ['_date', '_hour'] if (hourly) else ['_date']
+        df = df.with_columns(date.alias('_date'), hour.alias('_hour'))
+
+        written = []
+        for values, part in df.group_by(partitions, maintain_order=True):
+            path = self.partition_path(dataset, city, *values)
+            part = part.drop('_date', '_hour')
+            if (os.path.exists(path)):
+                part = pl.concat([self._plain(pl.read_parquet(path, hive_partitioning=False)), part])
+            part = part.unique(subset=keys, keep='last', maintain_order=True).sort(keys)
+            self._write(part, path)
+            written.append(path)
+        return written
+
+    @staticmethod
+    def _plain(df: pl.DataFrame) -> pl.DataFrame:
+        return df.with_columns(pl.col(col).cast(pl.String) for col, dtype in df.schema.items()
+                               if (dtype == pl.Categorical))
+
+    def _write(self, df: pl.DataFrame, path: str) -> None:
+        write_parquet_atomic(df, path,
+                             compression=self.compression,
+                             compression_level=self.compression_level,
+                             row_group_size=self.row_group_size,
+                             statistics=True)